@@ -2,9 +2,9 @@
 Пакет игровых модулей
 """
 from game.sprites import SpriteSheet, CharacterSprites, AnimationController, AnimatedSprite
-from game.enemy import Enemy, create_enemy, get_enemy_types, reload_enemy_types
+from game.enemy import Enemy, EnemyPool, create_enemy, get_enemy_types, reload_enemy_types
 from game.player import Player
-from game.level import Level, LevelManager, TileSet
+from game.level import Level, LevelManager, TileSet, pack_level_tiles, unpack_level_tiles
 from game.fog_of_war import FogOfWar
 
 __all__ = [
@@ -13,6 +13,7 @@ __all__ = [
     'AnimationController',
     'AnimatedSprite',
     'Enemy',
+    'EnemyPool',
     'create_enemy',
     'get_enemy_types',
     'reload_enemy_types',
@@ -20,5 +21,7 @@ __all__ = [
     'Level',
     'LevelManager',
     'TileSet',
+    'pack_level_tiles',
+    'unpack_level_tiles',
     'FogOfWar',
 ]
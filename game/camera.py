@@ -78,4 +78,50 @@ class Camera:
         adjusted_x = screen_x - offset[0]
         adjusted_y = screen_y - offset[1]
         return iso_converter.screen_to_world(adjusted_x, adjusted_y)
+    
+    def get_screen_to_world_transform(self, iso_converter):
+        """
+        Возвращает обратное преобразование экран -> мир как аффинные коэффициенты
+        
+        Позволяет посчитать преобразование один раз за кадр и дальше
+        переводить точки без делений:
+            world_x = ax * screen_x + bx * screen_y + ox
+            world_y = ay * screen_x + by * screen_y + oy
+        
+        Args:
+            iso_converter: Конвертер изометрических координат
+        
+        Returns:
+            tuple: (ax, bx, ox, ay, by, oy)
+        """
+        offset_x, offset_y = self.get_offset()
+        ax = iso_converter.inv_half_width * 0.5
+        bx = iso_converter.inv_half_height * 0.5
+        ay = -ax
+        by = bx
+        ox = -(ax * offset_x + bx * offset_y)
+        oy = -(ay * offset_x + by * offset_y)
+        return ax, bx, ox, ay, by, oy
+    
+    def get_world_bounds(self, iso_converter, margin=0.0):
+        """
+        Возвращает видимую область экрана в мировых координатах (AABB)
+        
+        Args:
+            iso_converter: Конвертер изометрических координат
+            margin: Дополнительный запас в мировых координатах
+            
+        Returns:
+            tuple: (min_x, min_y, max_x, max_y)
+        """
+        ax, bx, ox, ay, by, oy = self.get_screen_to_world_transform(iso_converter)
+        corners = (
+            (0, 0),
+            (self.screen_width, 0),
+            (0, self.screen_height),
+            (self.screen_width, self.screen_height),
+        )
+        xs = [ax * sx + bx * sy + ox for sx, sy in corners]
+        ys = [ay * sx + by * sy + oy for sx, sy in corners]
+        return (min(xs) - margin, min(ys) - margin, max(xs) + margin, max(ys) + margin)
 
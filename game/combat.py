@@ -212,6 +212,7 @@ class CombatSystem:
             
             # Проверяем попадания и наносим урон всем врагам в радиусе
             if enemies:
+                melee_range_sq = melee_range * melee_range
                 for enemy in enemies:
                     if enemy.is_dead or enemy.dying:
                         continue
@@ -219,9 +220,8 @@ class CombatSystem:
                     ex, ey = enemy.get_position()
                     dx = player_x - ex
                     dy = player_y - ey
-                    distance_from_player = math.sqrt(dx * dx + dy * dy)
                     
-                    if distance_from_player <= melee_range:
+                    if dx * dx + dy * dy <= melee_range_sq:
                         enemy.take_damage(damage)
                         attack.hit_enemies.append(enemy)
         else:
@@ -259,6 +259,22 @@ class CombatSystem:
             Список кортежей (attack, enemy) для попаданий
         """
         hits = []
+        
+        # Минимальное расстояние перед проверкой попадания (мировые)
+        min_distance_before_hit = 0.5
+        min_distance_before_hit_sq = min_distance_before_hit * min_distance_before_hit
+        
+        # Хитбокс для дальней атаки (в мировых координатах)
+        # hover_radius = 1.0 мировых, хитбокс должен быть сопоставим
+        enemy_hitbox_radius = 0.5  # Радиус хитбокса врага (~18 экранных)
+        projectile_hitbox_radius = 0.3  # Радиус хитбокса снаряда (~10 экранных)
+        hit_radius = enemy_hitbox_radius + projectile_hitbox_radius  # ~0.8 мировых
+        hit_radius_sq = hit_radius * hit_radius
+        
+        # Позиции живых врагов снимаются один раз на вызов (а не для каждой атаки);
+        # список строится лениво - только если есть летящая дальняя атака
+        enemy_positions = None
+        
         for attack in self.attacks:
             if not attack.active:
                 continue
@@ -269,35 +285,30 @@ class CombatSystem:
             
             # Проверяем попадания только если атака пролетела минимальное расстояние
             # Это предотвращает попадание сразу после создания (когда игрок рядом с врагом)
-            distance_from_start = math.sqrt(
-                (attack.x - attack.start_x) ** 2 + (attack.y - attack.start_y) ** 2
-            )
-            min_distance_before_hit = 0.5  # Минимальное расстояние перед проверкой попадания (мировые)
-            
-            if distance_from_start < min_distance_before_hit:
+            attack_x = attack.x
+            attack_y = attack.y
+            start_dx = attack_x - attack.start_x
+            start_dy = attack_y - attack.start_y
+            if start_dx * start_dx + start_dy * start_dy < min_distance_before_hit_sq:
                 continue  # Пропускаем проверку попадания, если атака слишком близко к началу
             
-            for enemy in enemies:
-                if enemy.is_dead or enemy in attack.hit_enemies:
+            if enemy_positions is None:
+                enemy_positions = [
+                    (enemy, *enemy.get_position()) for enemy in enemies if not enemy.is_dead
+                ]
+            
+            hit_enemies = attack.hit_enemies
+            for enemy, ex, ey in enemy_positions:
+                # Проверка попадания для дальних атак - используем хитбокс врага (без sqrt)
+                dx = attack_x - ex
+                dy = attack_y - ey
+                if dx * dx + dy * dy > hit_radius_sq or enemy in hit_enemies:
                     continue
                 
-                # Проверка попадания для дальних атак - используем хитбокс врага
-                ex, ey = enemy.get_position()
-                dx = attack.x - ex
-                dy = attack.y - ey
-                distance = math.sqrt(dx * dx + dy * dy)
-                
-                # Хитбокс для дальней атаки (в мировых координатах)
-                # hover_radius = 1.0 мировых, хитбокс должен быть сопоставим
-                enemy_hitbox_radius = 0.5  # Радиус хитбокса врага (~18 экранных)
-                projectile_hitbox_radius = 0.3  # Радиус хитбокса снаряда (~10 экранных)
-                hit_radius = enemy_hitbox_radius + projectile_hitbox_radius  # ~0.8 мировых
-                
-                if distance <= hit_radius:
-                    attack.hit_enemies.append(enemy)
-                    hits.append((attack, enemy))
-                    attack.active = False  # Атака исчезает после попадания
-                    break
+                hit_enemies.append(enemy)
+                hits.append((attack, enemy))
+                attack.active = False  # Атака исчезает после попадания
+                break
         
         return hits
     
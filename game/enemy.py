@@ -166,19 +166,20 @@ class Enemy:
         if self.attack_cooldown > 0:
             self.attack_cooldown -= dt
         
-        # Проверка расстояния до игрока
+        # Проверка расстояния до игрока (в квадрате; sqrt нужен только для движения)
         dx = player_x - self.world_x
         dy = player_y - self.world_y
-        distance = math.sqrt(dx * dx + dy * dy)
+        distance_sq = dx * dx + dy * dy
+        in_attack_range = distance_sq <= self.attack_range * self.attack_range
         
         attack_info = None
         
         # Если игрок в зоне агрессии
-        if distance <= self.aggro_range:
+        if distance_sq <= self.aggro_range * self.aggro_range:
             self.target = (player_x, player_y)
             
             # Проверяем, можем ли атаковать
-            if distance <= self.attack_range and self.attack_cooldown <= 0:
+            if in_attack_range and self.attack_cooldown <= 0:
                 # Атакуем игрока
                 attack_info = {
                     'damage': self.damage,
@@ -201,8 +202,9 @@ class Enemy:
                         is_melee=self.is_melee,
                         on_complete=self._on_attack_complete
                     )
-            elif distance > self.attack_range:
+            elif not in_attack_range:
                 # Движение к игроку
+                distance = math.sqrt(distance_sq)
                 move_x = (dx / distance) * self.speed * dt
                 move_y = (dy / distance) * self.speed * dt
                 self.world_x += move_x
@@ -227,6 +229,38 @@ class Enemy:
         
         return attack_info
     
+    def reset(self, x, y):
+        """
+        Возвращает врага в исходное состояние для повторного использования (пул врагов)
+        
+        Спрайты, тип и параметры атаки сохраняются - сбрасываются только
+        позиция, здоровье и состояние AI/анимаций.
+        
+        Args:
+            x, y: Новая позиция в мировых координатах
+        """
+        self.world_x = x
+        self.world_y = y
+        self.stats.health = self.stats.max_health
+        
+        self.angle = 0
+        self.sprite_angle = 0
+        self.attack_cooldown = 0.0
+        
+        self.is_dead = False
+        self.target = None
+        self.is_highlighted = False
+        self.is_moving = False
+        
+        self.death_animation_time = 0.0
+        self.dying = False
+        
+        self.attack_animation_time = 0.0
+        self.is_attacking = False
+        
+        if self.animated_sprite:
+            self.animated_sprite.reset()
+    
     def _on_attack_complete(self):
         """Callback по завершению анимации атаки"""
         self.is_attacking = False
@@ -282,8 +316,7 @@ class Enemy:
         
         dx = mouse_world_x - self.world_x
         dy = mouse_world_y - self.world_y
-        distance = math.sqrt(dx * dx + dy * dy)
-        return distance <= hover_radius
+        return dx * dx + dy * dy <= hover_radius * hover_radius
     
     def set_highlighted(self, highlighted):
         """Устанавливает состояние подсветки"""
@@ -527,3 +560,70 @@ def create_enemy(x, y, enemy_type='default', **kwargs):
         enemy.attack_cooldown_time = params['attack_cooldown']
     
     return enemy
+
+
+class EnemyPool:
+    """
+    Пул врагов - переиспользует погибших врагов вместо создания новых.
+    
+    Создание врага со спрайтами (загрузка и нарезка спрайтшитов) дорогое,
+    поэтому мёртвые враги возвращаются в пул и при следующем спавне
+    того же типа с теми же параметрами просто сбрасываются через reset().
+    
+    Использование:
+        pool = EnemyPool()
+        enemy = pool.acquire(5, 5, enemy_type='skeleton')
+        ...
+        pool.release(enemy)  # когда враг умер
+    """
+    
+    def __init__(self):
+        # Свободные враги: {(поколение, enemy_type, параметры): [Enemy, ...]}
+        self._free = {}
+        # Поколение пула - растёт при clear(), чтобы враги, созданные
+        # по старой конфигурации, не возвращались в пул
+        self._generation = 0
+    
+    def _make_key(self, enemy_type, kwargs):
+        """Ключ пула - поколение, тип врага и переопределённые параметры"""
+        return (self._generation, enemy_type, tuple(sorted(kwargs.items())))
+    
+    def acquire(self, x, y, enemy_type='default', **kwargs):
+        """
+        Возвращает врага из пула (или создаёт нового через create_enemy)
+        
+        Args:
+            x, y: Позиция врага
+            enemy_type: Тип врага (строка)
+            **kwargs: Дополнительные параметры для create_enemy
+        
+        Returns:
+            Enemy: Готовый к использованию враг
+        """
+        key = self._make_key(enemy_type, kwargs)
+        free = self._free.get(key)
+        if free:
+            enemy = free.pop()
+            enemy.reset(x, y)
+            return enemy
+        
+        enemy = create_enemy(x, y, enemy_type=enemy_type, **kwargs)
+        enemy.pool_key = key
+        return enemy
+    
+    def release(self, enemy):
+        """Возвращает врага в пул (враги старого поколения отбрасываются)"""
+        key = getattr(enemy, 'pool_key', None)
+        if key is not None and key[0] == self._generation:
+            self._free.setdefault(key, []).append(enemy)
+    
+    def release_all(self, enemies):
+        """Возвращает в пул всех врагов из списка"""
+        for enemy in enemies:
+            self.release(enemy)
+    
+    def clear(self):
+        """Очищает пул (например, после перезагрузки типов врагов)"""
+        self._free.clear()
+        self._generation += 1
+
@@ -39,26 +39,37 @@ class FogOfWar:
         """
         self.visible_tiles.clear()
         
-        # Определяем тайлы в радиусе исследования
-        radius_int = int(self.exploration_radius) + 1
+        # Определяем тайлы в радиусе исследования построчно:
+        # для каждой строки круга сразу вычисляем диапазон столбцов,
+        # центры которых попадают в радиус (один sqrt на строку вместо одного на тайл)
+        radius = self.exploration_radius
+        radius_sq = radius * radius
+        radius_int = int(radius) + 1
+        base_y = int(player_y)
+        
+        visible_tiles = self.visible_tiles
+        for tile_y in range(base_y - radius_int, base_y + radius_int + 1):
+            center_dy = tile_y + 0.5 - player_y
+            remaining = radius_sq - center_dy * center_dy
+            if remaining < 0:
+                continue
+            
+            half_width = math.sqrt(remaining)
+            first_x = math.ceil(player_x - half_width - 0.5)
+            last_x = math.floor(player_x + half_width - 0.5)
+            for tile_x in range(first_x, last_x + 1):
+                visible_tiles.add((tile_x, tile_y))
         
-        for dx in range(-radius_int, radius_int + 1):
-            for dy in range(-radius_int, radius_int + 1):
-                tile_x = int(player_x) + dx
-                tile_y = int(player_y) + dy
-                
-                # Проверяем расстояние от центра тайла до игрока
-                tile_center_x = tile_x + 0.5
-                tile_center_y = tile_y + 0.5
-                distance = math.sqrt(
-                    (tile_center_x - player_x) ** 2 + 
-                    (tile_center_y - player_y) ** 2
-                )
-                
-                if distance <= self.exploration_radius:
-                    self.visible_tiles.add((tile_x, tile_y))
-                    self.explored_tiles.add((tile_x, tile_y))
+        self.explored_tiles.update(visible_tiles)
+        self.last_player_pos = (player_x, player_y)
+    
+    def set_player_pos(self, player_x, player_y):
+        """
+        Сдвигает центр видимости без пересчёта видимых тайлов
         
+        Для кадров, когда игрок не сменил тайл: затемнение и проверка видимости
+        врагов следуют за игроком, а visible_tiles остаются от последнего update().
+        """
         self.last_player_pos = (player_x, player_y)
     
     def is_tile_visible(self, tile_x, tile_y):
@@ -75,11 +86,22 @@ class FogOfWar:
             return False
         
         player_x, player_y = self.last_player_pos
-        distance = math.sqrt(
-            (world_x - player_x) ** 2 + 
-            (world_y - player_y) ** 2
-        )
-        return distance <= self.vision_radius
+        dx = world_x - player_x
+        dy = world_y - player_y
+        return dx * dx + dy * dy <= self.vision_radius * self.vision_radius
+    
+    def get_vision_circle(self):
+        """
+        Возвращает круг видимости для пакетной проверки многих позиций за кадр
+        
+        Returns:
+            tuple: (center_x, center_y, radius_sq) или None, если игрок ещё не обновлялся
+        """
+        if self.last_player_pos is None:
+            return None
+        
+        player_x, player_y = self.last_player_pos
+        return player_x, player_y, self.vision_radius * self.vision_radius
     
     def draw_fog(self, screen, camera_offset, iso_converter, level_tiles=None):
         """
@@ -139,6 +139,27 @@ class InputHandler:
         """Проверяет, только что нажата ли клавиша"""
         return self.keys_just_pressed.get(key, False)
     
+    def just_pressed_bitmask(self, keys):
+        """
+        Возвращает битовую маску клавиш, только что нажатых в этом кадре
+        
+        Args:
+            keys: Последовательность клавиш (бит i соответствует keys[i])
+        
+        Returns:
+            int: Маска (0 - ни одна клавиша не нажата)
+        """
+        keys_just_pressed = self.keys_just_pressed
+        # Обычный кадр - нажатий нет, проверять клавиши не нужно
+        if not keys_just_pressed:
+            return 0
+        
+        mask = 0
+        for i, key in enumerate(keys):
+            if keys_just_pressed.get(key, False):
+                mask |= 1 << i
+        return mask
+    
     def get_gamepad_stick(self):
         """Возвращает позицию левого стика геймпада (x, y)"""
         return self.gamepad_left_stick
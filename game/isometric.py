@@ -16,6 +16,13 @@ class IsometricConverter:
         self.tile_width = tile_width
         self.tile_height = tile_height
         
+        # Половины тайла и обратные к ним величины (считаем один раз,
+        # в преобразованиях только умножения)
+        self.half_width = tile_width / 2
+        self.half_height = tile_height / 2
+        self.inv_half_width = 1.0 / self.half_width
+        self.inv_half_height = 1.0 / self.half_height
+        
         # Угол изометрической проекции (обычно 30 градусов)
         self.angle = math.radians(30)
         self.cos_angle = math.cos(self.angle)
@@ -32,8 +39,8 @@ class IsometricConverter:
             tuple: (screen_x, screen_y) - экранные координаты
         """
         # Изометрическое преобразование
-        screen_x = (x - y) * (self.tile_width / 2)
-        screen_y = (x + y) * (self.tile_height / 2)
+        screen_x = (x - y) * self.half_width
+        screen_y = (x + y) * self.half_height
         return int(screen_x), int(screen_y)
     
     def screen_to_world(self, screen_x, screen_y):
@@ -47,8 +54,10 @@ class IsometricConverter:
             tuple: (world_x, world_y) - мировые координаты
         """
         # Обратное изометрическое преобразование
-        world_x = (screen_x / (self.tile_width / 2) + screen_y / (self.tile_height / 2)) / 2
-        world_y = (screen_y / (self.tile_height / 2) - screen_x / (self.tile_width / 2)) / 2
+        sx = screen_x * self.inv_half_width
+        sy = screen_y * self.inv_half_height
+        world_x = (sx + sy) * 0.5
+        world_y = (sy - sx) * 0.5
         return world_x, world_y
     
     def get_tile_size(self):
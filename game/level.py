@@ -3,7 +3,9 @@
 Загрузка, отображение и управление уровнями игры
 """
 
+import bisect
 import json
+import mmap
 import os
 import sys
 from pathlib import Path
@@ -12,6 +14,12 @@ import math
 
 import pygame
 
+# orjson разбирает файл уровня в разы быстрее стандартного json; если не установлен - работаем на json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def _get_base_path():
     """Получает базовый путь для ресурсов"""
@@ -20,6 +28,108 @@ def _get_base_path():
     return Path(__file__).parent.parent
 
 
+def _read_level_json(level_file):
+    """
+    Читает JSON файла уровня
+    
+    orjson разбирает файл прямо из отображения в память (mmap) - без копии
+    содержимого в объект bytes и без декодирования в str.
+    """
+    if orjson is not None:
+        with open(level_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return orjson.loads(view)
+    with open(level_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def pack_level_tiles(level_data):
+    """
+    Упаковывает тайлы уровня в параллельные списки (формат tiles_v2, пишет редактор уровней)
+    
+    Вместо словаря {"x,y": {'tileset': имя, 'tile': индекс}} - без форматирования
+    строки-ключа и повтора имени тайлсета на каждую клетку.
+    
+    Args:
+        level_data: Словарь тайлов {(x, y): {'tileset': имя, 'tile': индекс}}
+    
+    Returns:
+        dict: {'xs': [...], 'ys': [...], 'tsid': [...], 'tid': [...], 'tileset_names': [...]},
+              tsid - индекс имени в tileset_names
+    """
+    tileset_names = []
+    tileset_ids = {}
+    # Координаты разбираем одним zip по ключам (порядок совпадает с values())
+    xs, ys = (list(column) for column in zip(*level_data)) if level_data else ([], [])
+    tsid, tid = [], []
+    for value in level_data.values():
+        name = value['tileset']
+        name_id = tileset_ids.get(name)
+        if name_id is None:
+            name_id = tileset_ids[name] = len(tileset_names)
+            tileset_names.append(name)
+        tsid.append(name_id)
+        tid.append(value['tile'])
+    
+    return {'xs': xs, 'ys': ys, 'tsid': tsid, 'tid': tid, 'tileset_names': tileset_names}
+
+
+def unpack_level_tiles(data):
+    """
+    Читает тайлы уровня из файла
+    
+    Поддерживает формат tiles_v2 (см. pack_level_tiles) и старый формат
+    tiles {"x,y": {'tileset': имя, 'tile': индекс}}.
+    
+    Returns:
+        dict: {(x, y): {'tileset': имя, 'tile': индекс}}
+    """
+    packed = data.get('tiles_v2')
+    if packed is None:
+        legacy = data.get('tiles') or {}
+        # Все ключи "x,y" разбираются одним вызовом json.loads как список чисел
+        # [x0, y0, x1, y1, ...] - вместо split и двух int() на каждый тайл
+        # Пакетный разбор возможен, только если в каждом ключе ровно одна запятая -
+        # иначе числа соседних ключей склеятся в неверные пары
+        coords = None
+        if all(key.count(',') == 1 for key in legacy):
+            try:
+                coords = json.loads(f"[{','.join(legacy)}]")
+            except ValueError:
+                pass
+        if coords is None or len(coords) != 2 * len(legacy) or not all(type(c) is int for c in coords):
+            # Ключи, которые не являются JSON-числами (например "01,2"),
+            # разбираются по одному, как раньше
+            coords = []
+            for key in legacy:
+                x, y = map(int, key.split(','))
+                coords += (x, y)
+        coords = iter(coords)
+        
+        # Одинаковые значения {'tileset', 'tile'} заменяются одним общим словарем
+        # (значения из JSON - отдельный объект на каждую клетку)
+        # setdefault берётся один раз, вне цикла
+        canonical = {}.setdefault
+        tiles = {}
+        for position, value in zip(zip(coords, coords), legacy.values()):
+            if len(value) == 2 and 'tileset' in value and 'tile' in value:
+                value = canonical((value['tileset'], value['tile']), value)
+            tiles[position] = value
+        return tiles
+    
+    # Словарь значения создаётся один раз на каждый различный тайл, клетки с одинаковым
+    # тайлом ссылаются на него (значения тайлов уровня только читаются).
+    # Цикл на Python - только по различным тайлам, словарь уровня собирается в C
+    names = packed['tileset_names']
+    values = dict.fromkeys(zip(packed['tsid'], packed['tid']))
+    for name_id, tile in values:
+        values[name_id, tile] = {'tileset': names[name_id], 'tile': tile}
+    return dict(zip(
+        zip(packed['xs'], packed['ys']),
+        map(values.__getitem__, zip(packed['tsid'], packed['tid']))
+    ))
+
+
 # Константы тайлов
 TILE_WIDTH = 128
 TILE_HEIGHT = 64
@@ -122,19 +232,16 @@ class Level:
             return False
         
         try:
-            with open(level_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _read_level_json(level_file)
             
             self.name = data.get('name', level_name)
             self.width = data.get('width', 20)
             self.height = data.get('height', 20)
             
-            self.tiles = {}
-            for key, value in data.get('tiles', {}).items():
-                x, y = map(int, key.split(','))
-                self.tiles[(x, y)] = value
+            self.tiles = unpack_level_tiles(data)
             
             self._dark_tiles_cache.clear()  # Очищаем кэш затемненных тайлов
+            self._reset_visible_tiles_cache()  # И кэш видимых тайлов
             
             print(f"Level '{self.name}' loaded: {len(self.tiles)} tiles")
             return True
@@ -196,6 +303,9 @@ class Level:
         # Объединяем с существующими тайлами
         self.tiles.update(new_tiles)
         
+        # Набор тайлов изменился - кэш видимых тайлов нужно пересобрать
+        self._reset_visible_tiles_cache()
+        
         # Ограничиваем размер кэша тайлов для производительности
         max_tiles = 1500  # Уменьшено для производительности
         
@@ -215,6 +325,11 @@ class Level:
                 tile_pos = tiles_with_distance_sq[i][0]
                 del self.tiles[tile_pos]
     
+    def _reset_visible_tiles_cache(self):
+        """Сбрасывает кэш видимых тайлов draw() (после изменения набора тайлов)"""
+        if hasattr(self, '_visible_tiles_cache'):
+            del self._visible_tiles_cache
+    
     def world_to_iso(self, world_x, world_y):
         """Конвертирует мировые координаты в изометрические экранные"""
         # Размер тайла в мировых координатах
@@ -263,7 +378,7 @@ class Level:
         
         # Проверяем кэш видимых тайлов
         if hasattr(self, '_visible_tiles_cache') and cache_key == getattr(self, '_last_cache_key', None):
-            tiles_to_draw = self._visible_tiles_cache
+            tile_order, tile_xs, tile_ys, tile_surfaces = self._visible_tiles_cache
         else:
             # Вычисляем видимую область в мировых координатах для предварительной фильтрации
             if iso_converter and player_pos:
@@ -274,9 +389,11 @@ class Level:
                 px, py = player_pos
                 visible_radius_sq = visible_radius * visible_radius
                 
-                # Предварительная фильтрация по расстоянию (быстрее чем изометрические преобразования)
+                # Предварительная фильтрация по расстоянию (быстрее чем изометрические преобразования).
+                # Записи (x + y, x, y, данные) берутся сразу из items(), без повторного поиска
+                # по ключу-кортежу для каждого тайла
                 tiles_to_draw = []
-                for (tx, ty) in self.tiles.keys():
+                for (tx, ty), tile_data in self.tiles.items():
                     # Быстрая проверка расстояния без sqrt
                     dx = tx - px
                     dy = ty - py
@@ -284,62 +401,86 @@ class Level:
                     if distance_sq > visible_radius_sq:
                         continue
                     
-                    tiles_to_draw.append((tx, ty))
+                    tiles_to_draw.append((tx + ty, tx, ty, tile_data))
             else:
-                tiles_to_draw = list(self.tiles.keys())
+                tiles_to_draw = [(tx + ty, tx, ty, tile_data) for (tx, ty), tile_data in self.tiles.items()]
             
-            # Сортируем только видимые тайлы (для правильного порядка отрисовки)
-            tiles_to_draw.sort(key=lambda pos: (pos[0] + pos[1], pos[0]))
+            # Сортируем только видимые тайлы (для правильного порядка отрисовки).
+            # Пара (x + y, x) у каждого тайла своя, поэтому записи сортируются
+            # как есть, без функции-ключа, и до сравнения данных дело не доходит
+            tiles_to_draw.sort()
+            
+            # Раскладываем тайлы в параллельные списки (ключ порядка (x + y, x), экранные x, y
+            # без камеры и поверхность): тайлсет и поверхность разрешаются один раз
+            # при обновлении кэша, а не каждый кадр
+            tile_order, tile_xs, tile_ys, tile_surfaces = [], [], [], []
+            for depth, tx, ty, tile_data in tiles_to_draw:
+                # Пропускаем пустые данные тайла
+                if not tile_data:
+                    continue
+                
+                tileset_name = tile_data.get('tileset')
+                tile_index = tile_data.get('tile', 0)
+                
+                # Быстрый доступ к тайлсету
+                tileset = self.tilesets.get(tileset_name)
+                if not tileset:
+                    continue
+                
+                tile_surface = tileset.get_tile(tile_index)
+                if not tile_surface:
+                    continue
+                
+                # Изометрические координаты
+                tile_order.append((depth, tx))
+                tile_xs.append((tx - ty) * (TILE_WIDTH // 2))
+                tile_ys.append((tx + ty) * (TILE_HEIGHT // 2))
+                tile_surfaces.append(tile_surface)
             
             # Кэшируем результат
             if cache_key is not None:
-                self._visible_tiles_cache = tiles_to_draw
+                self._visible_tiles_cache = (tile_order, tile_xs, tile_ys, tile_surfaces)
                 self._last_cache_key = cache_key
         
         # Отрисовываем тайлы
         # Тайлы отрисовываются всегда (без проверки тумана войны)
         # Туман войны применяется только к объектам (врагам, предметам)
-        # Оптимизация: предварительно фильтруем тайлы по экранным координатам
+        # Оптимизация: тайлы отсортированы по (x + y, x), экранный y зависит только от x + y,
+        # а внутри строки x + y экранный x - только от x. Поэтому видимые тайлы каждой строки -
+        # непрерывный диапазон индексов, он находится бинарным поиском по tile_order
+        # (границы с запасом в одну клетку, точная проверка - ниже)
+        camera_x, camera_y = camera_offset
         tiles_to_render = []
+        if not tile_order:
+            return
         
-        for (tx, ty) in tiles_to_draw:
-            # Изометрические координаты
-            screen_x = (tx - ty) * (TILE_WIDTH // 2)
-            screen_y = (tx + ty) * (TILE_HEIGHT // 2)
-            
-            # Применяем смещение камеры
-            final_x = screen_x + camera_offset[0]
-            final_y = screen_y + camera_offset[1]
-            
-            # Строгая проверка видимости на экране
-            if final_x < screen_left or final_x > screen_right:
-                continue
-            if final_y < screen_top or final_y > screen_bottom:
-                continue
-            
-            # Получаем данные тайла
-            tile_data = self.tiles.get((tx, ty))
-            if not tile_data:
-                continue
-            
-            tileset_name = tile_data.get('tileset')
-            tile_index = tile_data.get('tile', 0)
-            
-            # Быстрый доступ к тайлсету
-            tileset = self.tilesets.get(tileset_name)
-            if not tileset:
-                continue
-            
-            tile_surface = tileset.get_tile(tile_index)
-            if not tile_surface:
-                continue
-            
-            # Добавляем в список для отрисовки
-            tiles_to_render.append((tile_surface, final_x, final_y))
+        half_width = TILE_WIDTH // 2
+        half_height = TILE_HEIGHT // 2
+        first_depth = max(math.floor((screen_top - camera_y) / half_height) - 1, tile_order[0][0])
+        last_depth = min(math.ceil((screen_bottom - camera_y) / half_height) + 1, tile_order[-1][0])
+        # screen_x = (2 * x - (x + y)) * half_width
+        left = (screen_left - camera_x) / half_width
+        right = (screen_right - camera_x) / half_width
+        
+        for depth in range(first_depth, last_depth + 1):
+            start = bisect.bisect_left(tile_order, (depth, math.floor((left + depth) / 2) - 1))
+            stop = bisect.bisect_left(tile_order, (depth, math.ceil((right + depth) / 2) + 2))
+            for i in range(start, stop):
+                # Применяем смещение камеры
+                final_x = tile_xs[i] + camera_x
+                final_y = tile_ys[i] + camera_y
+                
+                # Строгая проверка видимости на экране
+                if final_x < screen_left or final_x > screen_right:
+                    continue
+                if final_y < screen_top or final_y > screen_bottom:
+                    continue
+                
+                # Добавляем в список для отрисовки
+                tiles_to_render.append((tile_surfaces[i], (final_x, final_y)))
         
         # Batch отрисовка всех тайлов
-        for tile_surface, x, y in tiles_to_render:
-            screen.blit(tile_surface, (x, y))
+        screen.blits(tiles_to_render, doreturn=False)
 
 
 class LevelManager:
@@ -326,16 +326,37 @@ class ProceduralWorldGenerator:
         Возвращает точки спавна врагов в радиусе
         """
         spawn_points = []
+        # Генерируем все чанки квадрата (порядок генерации влияет на случайные точки спавна)
         chunks = self.get_chunks_in_radius(center_x, center_y, radius)
+        radius_sq = radius * radius
         
         for chunk in chunks:
+            if not chunk.enemy_spawn_points:
+                continue
+            
+            # Чанки - это готовая сетка: сначала проверяем чанк целиком
+            start_x, start_y, end_x, end_y = chunk.get_world_bounds()
+            last_x = end_x - 1
+            last_y = end_y - 1
+            
+            # Ближайшая к центру точка чанка дальше радиуса - пропускаем весь чанк
+            near_dx = center_x - min(max(center_x, start_x), last_x)
+            near_dy = center_y - min(max(center_y, start_y), last_y)
+            if near_dx * near_dx + near_dy * near_dy > radius_sq:
+                continue
+            
+            # Самая дальняя точка чанка в радиусе - берём все точки без проверки
+            far_dx = max(abs(start_x - center_x), abs(last_x - center_x))
+            far_dy = max(abs(start_y - center_y), abs(last_y - center_y))
+            if far_dx * far_dx + far_dy * far_dy <= radius_sq:
+                spawn_points.extend(chunk.enemy_spawn_points)
+                continue
+            
             for x, y, biome in chunk.enemy_spawn_points:
-                # Проверяем расстояние
+                # Проверяем расстояние (без sqrt)
                 dx = x - center_x
                 dy = y - center_y
-                distance = math.sqrt(dx * dx + dy * dy)
-                
-                if distance <= radius:
+                if dx * dx + dy * dy <= radius_sq:
                     spawn_points.append((x, y, biome))
         
         return spawn_points
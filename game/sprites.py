@@ -534,3 +534,5 @@ class AnimatedSprite:
             self.animation.current_animation = 'walk'
             self.animation.current_frame = 0
             self.animation.animation_time = 0.0
+            self.animation.is_playing_once = False
+            self.animation.on_animation_complete = None
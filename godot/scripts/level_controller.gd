@@ -51,6 +51,9 @@ func load_level(level_name: String) -> bool:
 		tiles = generated.get("tiles", {})
 		spawn_points.append_array(generated.get("spawn_points", []))
 		props.append_array(generated.get("props", []))
+	elif data.has("tiles_v2"):
+		_load_tiles_from_packed(data["tiles_v2"])
+		_fill_missing_tiles()
 	else:
 		_load_tiles_from_json(data.get("tiles", {}))
 		_fill_missing_tiles()
@@ -86,6 +89,23 @@ func _load_tiles_from_json(raw: Variant) -> void:
 			tiles[Vector2i(int(parts[0]), int(parts[1]))] = raw[key]
 
 
+## Формат редактора tiles_v2: параллельные списки xs, ys, tsid, tid и tileset_names.
+func _load_tiles_from_packed(raw: Variant) -> void:
+	if typeof(raw) != TYPE_DICTIONARY:
+		return
+	var xs: Array = raw.get("xs", [])
+	var ys: Array = raw.get("ys", [])
+	var tsid: Array = raw.get("tsid", [])
+	var tid: Array = raw.get("tid", [])
+	var names: Array = raw.get("tileset_names", [])
+	var count := mini(mini(xs.size(), ys.size()), mini(tsid.size(), tid.size()))
+	for i in range(count):
+		var name_id := int(tsid[i])
+		if name_id < 0 or name_id >= names.size():
+			continue
+		tiles[Vector2i(int(xs[i]), int(ys[i]))] = {"tileset": names[name_id], "tile": tid[i]}
+
+
 func _fill_missing_tiles() -> void:
 	var default_tile := KenneyTileCatalog.default_floor_tile()
 	for x in range(width):
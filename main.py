@@ -3,16 +3,16 @@
 """
 import pygame
 import sys
-import time
 import math
 import random
+import heapq
 from game.isometric import IsometricConverter
 from game.input_handler import InputHandler
 from game.player import Player
 from game.camera import Camera
 from game.combat import CombatSystem
 from game.location import Location, LocationManager
-from game.enemy import Enemy, create_enemy, get_enemy_types, reload_enemy_types
+from game.enemy import EnemyPool, get_enemy_types, reload_enemy_types
 from game.level import LevelManager
 from game.fog_of_war import FogOfWar
 
@@ -28,6 +28,75 @@ GRAY = (128, 128, 128)
 DARK_GRAY = (64, 64, 64)
 RED = (255, 0, 0)
 
+# Запас видимой области для отсечения врагов и снарядов (в мировых координатах).
+# Спрайт врага до 256px (масштаб 1.0): 128px по горизонтали и 256px вверх дают
+# 128/64 + 256/32 = 10 = 2 * запас - объект за пределами запаса не попадает на экран
+ENTITY_CULL_MARGIN = 5.0
+
+# Подсказки управления в HUD
+INFO_CONTROLS = (
+    "Управление:",
+    "WASD - движение",
+    "ЛКМ - атака",
+    "Клавиша 2 - переключение ближний/дальний бой",
+    "Клавиши 1, 3-9 - способности",
+    "ESC - меню"
+)
+INFO_ENEMY_CONTROLS = (
+    "Настройки врагов:",
+    "+/- - частота спавна",
+    "[/] - макс. количество"
+)
+
+# Клавиши способностей (1, 3-9)
+ABILITY_KEYS = (
+    pygame.K_1, pygame.K_3, pygame.K_4, pygame.K_5,
+    pygame.K_6, pygame.K_7, pygame.K_8, pygame.K_9
+)
+
+
+class MenuItem:
+    """Пункт меню паузы (или подменю)"""
+    
+    __slots__ = ('text', 'action', 'type', 'setting')
+    
+    def __init__(self, text, action=None, type=None, setting=None):
+        self.text = text  # Строка или функция, возвращающая строку
+        self.action = action
+        self.type = type  # "action", "setting" или id типа врага
+        self.setting = setting  # Имя настройки для пунктов типа "setting"
+
+
+class EnemyProjectile:
+    """Снаряд врага (слоты вместо словаря - меньше памяти и быстрый доступ к полям)"""
+    
+    __slots__ = ('x', 'y', 'vx', 'vy', 'speed', 'damage', 'range', 'distance', 'active', 'age')
+    
+    def __init__(self, x, y, vx, vy, speed, damage, range=15.0):
+        self.reset(x, y, vx, vy, speed, damage, range)
+    
+    def reset(self, x, y, vx, vy, speed, damage, range=15.0):
+        """
+        Задаёт снаряду новое состояние (для повторного использования из пула)
+        
+        Args:
+            x, y: Начальная позиция
+            vx, vy: Скорость по осям (мировых единиц в секунду)
+            speed: Модуль скорости
+            damage: Урон
+            range: Максимальная дальность
+        """
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.speed = speed
+        self.damage = damage
+        self.range = range
+        self.distance = 0.0
+        self.active = True
+        self.age = 0.0
+
 
 class Game:
     """Главный класс игры"""
@@ -59,10 +128,26 @@ class Game:
         self.font_medium = pygame.font.Font(None, 24)
         self.font_large = pygame.font.Font(None, 32)
         
+        # Кэш отрендеренного текста меню: {(текст, шрифт, цвет): Surface}
+        self.text_cache = {}
+        # Последний вариант каждой изменяемой строки HUD: {slot: (text, color, surface)}
+        self.info_line_cache = {}
+        # Блок подсказок управления не меняется - рендерим его один раз целиком
+        # (отдельный вариант с подсказками настроек врагов): {enemies_enabled: Surface}
+        self.controls_surfaces = {
+            False: self._build_controls_surface(False),
+            True: self._build_controls_surface(True)
+        }
+        
         # Инициализация систем
         # Увеличенный масштаб для приближения камеры к персонажу
         self.iso_converter = IsometricConverter(tile_width=128, tile_height=64)
+        # Экранные координаты точек сетки без смещения камеры (сетка фиксирована -
+        # проецируем один раз, в кадре остаётся только прибавить смещение)
+        self.grid_screen_points = self._build_grid_screen_points(self.iso_converter)
         self.input_handler = InputHandler()
+        # Таблица направлений движения по маске нажатых клавиш WASD
+        self.move_lut = self._build_move_lut()
         self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT)
         
         # Создание персонажа
@@ -71,6 +156,13 @@ class Game:
         
         # Снаряды врагов
         self.enemy_projectiles = []
+        # Отработавшие снаряды (объекты EnemyProjectile переиспользуются вместо создания новых)
+        self.enemy_projectile_pool = []
+        # Готовые спрайты снарядов по размеру пульсации: {size: (surface, смещение центра)}
+        self.projectile_sprites = {}
+        
+        # Пул врагов (мёртвые враги переиспользуются при следующем спавне)
+        self.enemy_pool = EnemyPool()
         
         # Создание локаций
         self.location_manager = LocationManager()
@@ -86,15 +178,46 @@ class Game:
         # Миникарта (создаём поверхность один раз!)
         self.minimap_size = 150
         self.minimap_radius = 200
+        # Холст миникарты: каждый кадр очищается и перерисовывается, но не пересоздаётся
         self.minimap_surface = pygame.Surface((self.minimap_size, self.minimap_size), pygame.SRCALPHA)
-        pygame.draw.rect(self.minimap_surface, (0, 0, 0, 180), (0, 0, self.minimap_size, self.minimap_size))
-        pygame.draw.rect(self.minimap_surface, WHITE, (0, 0, self.minimap_size, self.minimap_size), 2)
+        # Масштаб: 1 тайл = несколько пикселей на миникарте
+        self.minimap_tile_size = 5
+        # Ромб тайла растеризуется один раз - дальше рисуем его готовыми отрезками
+        self.minimap_tile_runs = self._build_minimap_tile_runs(self.minimap_tile_size)
+        # Цвета тайлов миникарты по имени тайлсета: {name: (яркий, тусклый)} в упакованном виде
+        self.minimap_tileset_colors = {}
+        
+        # Затемнение для меню паузы и Game Over (создаём один раз, convert_alpha для быстрого blit)
+        self.dim_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA).convert_alpha()
+        self.dim_overlay.fill((0, 0, 0, 180))
+        
+        # Кадр паузы: снимок затемнённого мира (рисуется один раз при входе в паузу)
+        # и прямоугольники меню, обновлённые на экране в прошлом кадре
+        self.pause_background = None
+        self.menu_dirty_rects = []
+        # Кадр Game Over уже нарисован (экран не меняется до перезапуска)
+        self.game_over_frame_drawn = False
+        
+        # Точка врага на миникарте (рисуем один раз, дальше только blit)
+        self.minimap_enemy_dot_radius = 3
+        dot_size = self.minimap_enemy_dot_radius * 2 + 1
+        self.minimap_enemy_dot = pygame.Surface((dot_size, dot_size), pygame.SRCALPHA)
+        pygame.draw.circle(self.minimap_enemy_dot, RED,
+                           (self.minimap_enemy_dot_radius, self.minimap_enemy_dot_radius),
+                           self.minimap_enemy_dot_radius)
+        
+        # Метка игрока на миникарте (заливка + белая обводка, рисуем один раз)
+        self.minimap_player_dot_radius = 4
+        dot_size = self.minimap_player_dot_radius * 2 + 1
+        dot_center = (self.minimap_player_dot_radius, self.minimap_player_dot_radius)
+        self.minimap_player_dot = pygame.Surface((dot_size, dot_size), pygame.SRCALPHA)
+        pygame.draw.circle(self.minimap_player_dot, (100, 180, 255), dot_center, self.minimap_player_dot_radius)
+        pygame.draw.circle(self.minimap_player_dot, WHITE, dot_center, self.minimap_player_dot_radius, 1)
         
         # Состояние игры
         self.running = True
         self.game_over = False
         self.paused = False
-        self.last_time = time.time()
         
         # Режим врагов (по умолчанию выключен)
         self.enemies_enabled = False
@@ -103,9 +226,13 @@ class Game:
         self.enemy_spawn_frequency = 2.0  # Интервал проверки спавна в секундах (частота)
         self.max_enemies = 12  # Максимальное количество врагов одновременно
         
-        # Кэш позиции для оптимизации обновления тайлов
-        self.last_tile_update_pos = (0, 0)
-        self.tile_update_threshold = 5.0  # Обновляем тайлы только при перемещении на 5+ тайлов
+        # Типы врагов для процедурного спавна (все кроме default), обновляются при перезагрузке
+        self.available_enemy_types = []
+        self._update_available_enemy_types()
+        
+        # Тайл игрока при последнем пересчёте видимых тайлов тумана войны
+        # (None - пересчитать на ближайшем кадре)
+        self.fog_update_tile = None
         
         # Кэш для спавна врагов (не спавним каждый кадр)
         self.last_enemy_spawn_pos = (0, 0)
@@ -128,6 +255,40 @@ class Game:
         self.selected_enemy_type = 0
         self._build_enemy_submenu()
     
+    def _render_text(self, text, font, color):
+        """Рендерит текст с кэшированием (font.render дорогой и создаёт новую поверхность)"""
+        key = (text, font, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.text_cache[key] = surface
+        return surface
+    
+    def _build_controls_surface(self, with_enemy_controls):
+        """
+        Рендерит блок подсказок управления в одну поверхность
+        
+        Args:
+            with_enemy_controls: Добавить подсказки настроек врагов
+        
+        Returns:
+            pygame.Surface: Прозрачная поверхность со всеми строками блока
+        """
+        lines = [(text, GRAY) for text in INFO_CONTROLS]
+        if with_enemy_controls:
+            lines.extend((text, (150, 255, 150)) for text in INFO_ENEMY_CONTROLS)
+        
+        rendered = [self.font_medium.render(text, True, color) for text, color in lines]
+        width = max(line.get_width() for line in rendered)
+        height = 25 * (len(rendered) - 1) + rendered[-1].get_height()
+        
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        for i, line in enumerate(rendered):
+            # Строки не перекрываются, поэтому BLEND_RGBA_MAX просто копирует пиксели
+            # вместе с альфой (обычный blit на прозрачный фон затемнил бы края букв)
+            surface.blit(line, (0, i * 25), special_flags=pygame.BLEND_RGBA_MAX)
+        return surface
+    
     def _setup_locations(self):
         """Настройка локаций"""
         # Начальная локация (открытое поле) - без врагов
@@ -173,23 +334,31 @@ class Game:
         
         player_x, player_y = self.player.get_position()
         
+        # Сначала одним проходом считаем все позиции (шаг угла и функции - локальные),
+        # затем создаём врагов; порядок вызовов random сохранён
+        angle_step = 2 * math.pi / count
+        uniform = random.uniform
+        cos = math.cos
+        sin = math.sin
+        positions = []
         for i in range(count):
-            angle = (2 * math.pi / count) * i + random.uniform(-0.3, 0.3)
-            distance = random.uniform(3, 6)  # В мировых координатах
-            x = player_x + math.cos(angle) * distance
-            y = player_y + math.sin(angle) * distance
-            
-            # Используем фабрику для создания врагов с разными типами
-            enemy = create_enemy(x, y, enemy_type=enemy_type, max_health=30, damage=8)
-            location.enemies.append(enemy)
+            angle = angle_step * i + uniform(-0.3, 0.3)
+            distance = uniform(3, 6)  # В мировых координатах
+            positions.append((player_x + cos(angle) * distance, player_y + sin(angle) * distance))
+        
+        # Берём врагов из пула (создаются через фабрику, если свободных нет)
+        acquire = self.enemy_pool.acquire
+        location.enemies.extend(
+            acquire(x, y, enemy_type=enemy_type, max_health=30, damage=8)
+            for x, y in positions
+        )
     
     def run(self):
         """Главный игровой цикл"""
         while self.running:
-            # Расчет времени между кадрами
-            current_time = time.time()
-            dt = min(current_time - self.last_time, 0.1)
-            self.last_time = current_time
+            # Расчет времени между кадрами: clock.tick ограничивает FPS
+            # и сам возвращает время прошедшего кадра в миллисекундах
+            dt = min(self.clock.tick(FPS) * 0.001, 0.1)
             
             # Обработка событий
             self._handle_events()
@@ -199,18 +368,26 @@ class Game:
                 self._update(dt)
             
             # Отрисовка
-            self._draw()
-            
-            # Меню паузы поверх всего
             if self.paused:
-                self._draw_pause_menu()
-            
-            # Обновление экрана с VSync для синхронизации с частотой обновления монитора
-            # Это уменьшает разрывы экрана и использует возможности видеокарты
-            pygame.display.flip()
-            # VSync автоматически синхронизирует с частотой обновления монитора
-            # при использовании DOUBLEBUF и HWSURFACE
-            self.clock.tick(FPS)
+                # Мир на паузе заморожен - перерисовываем и обновляем только меню
+                self._draw_paused_frame()
+            elif self.game_over:
+                # После Game Over мир тоже заморожен: сцена с затемнением рисуется
+                # один раз и остаётся на экране до перезапуска
+                if not self.game_over_frame_drawn:
+                    self._draw()
+                    self.game_over_frame_drawn = True
+                pygame.display.flip()
+            else:
+                self.pause_background = None
+                self.game_over_frame_drawn = False
+                self._draw()
+                
+                # Обновление экрана с VSync для синхронизации с частотой обновления монитора
+                # Это уменьшает разрывы экрана и использует возможности видеокарты
+                pygame.display.flip()
+                # VSync автоматически синхронизирует с частотой обновления монитора
+                # при использовании DOUBLEBUF и HWSURFACE
         
         pygame.quit()
         sys.exit()
@@ -257,8 +434,8 @@ class Game:
         elif event.key == pygame.K_LEFT or event.key == pygame.K_a:
             # Изменение настроек влево
             selected_item = self.menu_items[self.selected_menu_item]
-            if selected_item.get("type") == "setting":
-                setting = selected_item.get("setting")
+            if selected_item.type == "setting":
+                setting = selected_item.setting
                 if setting == "frequency":
                     # Уменьшить частоту спавна (увеличить интервал)
                     self.enemy_spawn_frequency = min(10.0, self.enemy_spawn_frequency + 0.5)
@@ -267,11 +444,15 @@ class Game:
                     self.max_enemies = max(2, self.max_enemies - 2)
                 # Обновляем интервал спавна
                 self.enemy_spawn_interval = self.enemy_spawn_frequency
+                # Текст настройки изменился
+                self.text_cache.clear()
+                # HUD в снимке паузы показывает старые значения
+                self.pause_background = None
         elif event.key == pygame.K_RIGHT or event.key == pygame.K_d:
             # Изменение настроек вправо
             selected_item = self.menu_items[self.selected_menu_item]
-            if selected_item.get("type") == "setting":
-                setting = selected_item.get("setting")
+            if selected_item.type == "setting":
+                setting = selected_item.setting
                 if setting == "frequency":
                     # Увеличить частоту спавна (уменьшить интервал)
                     self.enemy_spawn_frequency = max(0.5, self.enemy_spawn_frequency - 0.5)
@@ -280,11 +461,15 @@ class Game:
                     self.max_enemies = min(50, self.max_enemies + 2)
                 # Обновляем интервал спавна
                 self.enemy_spawn_interval = self.enemy_spawn_frequency
+                # Текст настройки изменился
+                self.text_cache.clear()
+                # HUD в снимке паузы показывает старые значения
+                self.pause_background = None
         elif event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
             selected_item = self.menu_items[self.selected_menu_item]
             # Настройки не имеют действия, только действия выполняются
-            if selected_item.get("type") == "action" and selected_item.get("action"):
-                selected_item["action"]()
+            if selected_item.type == "action" and selected_item.action:
+                selected_item.action()
     
     def _handle_level_submenu_input(self, event):
         """Обработка ввода в подменю уровней"""
@@ -293,7 +478,7 @@ class Game:
         elif event.key == pygame.K_DOWN or event.key == pygame.K_s:
             self.selected_level = (self.selected_level + 1) % len(self.level_submenu_items)
         elif event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
-            self.level_submenu_items[self.selected_level]["action"]()
+            self.level_submenu_items[self.selected_level].action()
         elif event.key == pygame.K_LEFT or event.key == pygame.K_a:
             self._close_level_submenu()
         elif event.key == pygame.K_ESCAPE:
@@ -306,7 +491,7 @@ class Game:
         elif event.key == pygame.K_DOWN or event.key == pygame.K_s:
             self.selected_enemy_type = (self.selected_enemy_type + 1) % len(self.enemy_submenu_items)
         elif event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
-            self.enemy_submenu_items[self.selected_enemy_type]["action"]()
+            self.enemy_submenu_items[self.selected_enemy_type].action()
         elif event.key == pygame.K_LEFT or event.key == pygame.K_a:
             self._close_enemy_submenu()
         elif event.key == pygame.K_ESCAPE:
@@ -316,8 +501,13 @@ class Game:
         """Перезапуск игры"""
         self.player = Player(x=0, y=0, speed=8.0, max_health=100, max_mana=100)
         self.combat_system = CombatSystem()
-        self.enemy_projectiles = []  # Очищаем снаряды врагов
+        # Очищаем снаряды врагов (возвращаем в пул)
+        self.enemy_projectile_pool.extend(self.enemy_projectiles)
+        self.enemy_projectiles = []
+        # Враги старой локации возвращаются в пул
+        self._kill_all_enemies()
         self._setup_locations()
+        self.fog_update_tile = None
         self.game_over = False
         self.paused = False
         # Режим врагов остается как был (не сбрасываем)
@@ -335,37 +525,38 @@ class Game:
         """Убить всех врагов"""
         location = self.location_manager.get_current_location()
         if location:
+            self.enemy_pool.release_all(location.enemies)
             location.enemies.clear()
+        # Мир изменился - снимок фона паузы нужно перерисовать
+        self.pause_background = None
     
     def _build_menu_items(self):
         """Строит список пунктов меню (динамически, в зависимости от состояния)"""
         self.menu_items = [
-            {"text": "Продолжить", "action": self._resume_game, "type": "action"},
-            {"text": "Уровни ▶", "action": self._open_level_submenu, "type": "action"},
-            {"text": "Противники ▶", "action": self._open_enemy_submenu, "type": "action"},
-            {"text": self._get_enemy_mode_text, "action": self._toggle_enemy_mode, "type": "action"},
+            MenuItem("Продолжить", self._resume_game, "action"),
+            MenuItem("Уровни ▶", self._open_level_submenu, "action"),
+            MenuItem("Противники ▶", self._open_enemy_submenu, "action"),
+            MenuItem(self._get_enemy_mode_text, self._toggle_enemy_mode, "action"),
         ]
         
         # Если враги включены, добавляем настройки спавна
         if self.enemies_enabled:
-            self.menu_items.append({
-                "text": self._get_spawn_frequency_text, 
-                "action": None, 
-                "type": "setting",
-                "setting": "frequency"
-            })
-            self.menu_items.append({
-                "text": self._get_max_enemies_text, 
-                "action": None, 
-                "type": "setting",
-                "setting": "max_enemies"
-            })
+            self.menu_items.append(MenuItem(
+                self._get_spawn_frequency_text,
+                type="setting",
+                setting="frequency"
+            ))
+            self.menu_items.append(MenuItem(
+                self._get_max_enemies_text,
+                type="setting",
+                setting="max_enemies"
+            ))
         
         # Остальные пункты меню
         self.menu_items.extend([
-            {"text": "Убить всех врагов", "action": self._kill_all_enemies, "type": "action"},
-            {"text": "Перезапуск", "action": self._restart_game, "type": "action"},
-            {"text": "Выход", "action": self._quit_game, "type": "action"},
+            MenuItem("Убить всех врагов", self._kill_all_enemies, "action"),
+            MenuItem("Перезапуск", self._restart_game, "action"),
+            MenuItem("Выход", self._quit_game, "action"),
         ])
     
     def _get_enemy_mode_text(self):
@@ -389,6 +580,8 @@ class Game:
         # Обновляем интервал спавна
         self.enemy_spawn_interval = self.enemy_spawn_frequency
         # Перестраиваем меню
+        self.text_cache.clear()
+        self.pause_background = None
         old_selection = self.selected_menu_item
         self._build_menu_items()
         # Восстанавливаем выбор (но не выходим за границы)
@@ -399,7 +592,7 @@ class Game:
         enemy_types = get_enemy_types()
         
         self.enemy_submenu_items = [
-            {"text": "◀ Назад", "action": self._close_enemy_submenu, "type": None}
+            MenuItem("◀ Назад", self._close_enemy_submenu)
         ]
         
         for enemy_id, enemy_data in enemy_types.items():
@@ -407,17 +600,13 @@ class Game:
             hp = enemy_data.get('max_health', 30)
             dmg = enemy_data.get('damage', 5)
             
-            self.enemy_submenu_items.append({
-                "text": f"{name} (HP:{hp} DMG:{dmg})",
-                "action": lambda eid=enemy_id: self._spawn_enemy_type(eid),
-                "type": enemy_id
-            })
-        
-        self.enemy_submenu_items.append({
-            "text": "🔄 Обновить список", 
-            "action": self._refresh_enemy_types,
-            "type": None
-        })
+            self.enemy_submenu_items.append(MenuItem(
+                f"{name} (HP:{hp} DMG:{dmg})",
+                lambda eid=enemy_id: self._spawn_enemy_type(eid),
+                enemy_id
+            ))
+        
+        self.enemy_submenu_items.append(MenuItem("🔄 Обновить список", self._refresh_enemy_types))
     
     def _open_enemy_submenu(self):
         """Открывает подменю противников"""
@@ -432,12 +621,22 @@ class Game:
     def _spawn_enemy_type(self, enemy_type):
         """Спавнит врага выбранного типа"""
         self._spawn_enemies(1, enemy_type=enemy_type)
+        # Мир изменился - снимок фона паузы нужно перерисовать
+        self.pause_background = None
     
     def _refresh_enemy_types(self):
         """Обновляет список типов врагов из конфига"""
         reload_enemy_types()
+        self._update_available_enemy_types()
+        self.text_cache.clear()
+        # Параметры типов могли измениться - старые враги в пуле больше не подходят
+        self.enemy_pool.clear()
         self._build_enemy_submenu()
     
+    def _update_available_enemy_types(self):
+        """Обновляет список типов врагов для процедурного спавна"""
+        self.available_enemy_types = [eid for eid in get_enemy_types() if eid != 'default']
+    
     def _open_level_submenu(self):
         """Открывает подменю уровней"""
         self._build_level_submenu()
@@ -450,6 +649,8 @@ class Game:
     
     def _build_level_submenu(self):
         """Строит подменю уровней"""
+        # Отметка текущего уровня могла измениться
+        self.text_cache.clear()
         self.level_submenu_items = []
         
         # Доступные уровни
@@ -457,21 +658,15 @@ class Game:
             current = self.level_manager.get_current_level()
             is_current = current and current.name == level_name
             prefix = "● " if is_current else ""
-            self.level_submenu_items.append({
-                "text": f"{prefix}{level_name}",
-                "action": lambda name=level_name: self._load_level(name)
-            })
+            self.level_submenu_items.append(MenuItem(
+                f"{prefix}{level_name}",
+                lambda name=level_name: self._load_level(name)
+            ))
         
         if not self.level_submenu_items:
-            self.level_submenu_items.append({
-                "text": "(нет уровней)",
-                "action": lambda: None
-            })
+            self.level_submenu_items.append(MenuItem("(нет уровней)", lambda: None))
         
-        self.level_submenu_items.append({
-            "text": "← Назад",
-            "action": self._close_level_submenu
-        })
+        self.level_submenu_items.append(MenuItem("← Назад", self._close_level_submenu))
     
     def _load_level(self, level_name):
         """Загружает выбранный уровень"""
@@ -488,11 +683,18 @@ class Game:
         player_x, player_y = self.player.get_position()
         self.camera.update(player_x, player_y, self.iso_converter)
         
+        # Позиция мыши в мировых координатах - считаем один раз за кадр
+        # по аффинному преобразованию камеры (а не отдельно для каждого потребителя)
+        ax, bx, ox, ay, by, oy = self.camera.get_screen_to_world_transform(self.iso_converter)
+        mouse_screen_x, mouse_screen_y = self.input_handler.get_mouse_pos()
+        mouse_world_x = ax * mouse_screen_x + bx * mouse_screen_y + ox
+        mouse_world_y = ay * mouse_screen_x + by * mouse_screen_y + oy
+        
         # Подсветка врагов при наведении
-        self._update_enemy_highlight(current_location)
+        self._update_enemy_highlight(current_location, mouse_world_x, mouse_world_y)
         
         # Обработка атак игрока
-        self._handle_player_attacks(current_location)
+        self._handle_player_attacks(current_location, mouse_world_x, mouse_world_y)
         
         # Обработка движения
         keyboard_input = self._get_keyboard_input()
@@ -502,8 +704,14 @@ class Game:
         player_x, player_y = self.player.get_position()
         self.camera.update(player_x, player_y, self.iso_converter)
         
-        # Обновление тумана войны
-        self.fog_of_war.update(player_x, player_y)
+        # Обновление тумана войны: видимые тайлы пересчитываются только при смене
+        # тайла игрока, центр затемнения и видимости врагов сдвигается каждый кадр
+        player_tile = (int(player_x), int(player_y))
+        if player_tile != self.fog_update_tile:
+            self.fog_of_war.update(player_x, player_y)
+            self.fog_update_tile = player_tile
+        else:
+            self.fog_of_war.set_player_pos(player_x, player_y)
         
         # Обновление процедурного спавна врагов (с кулдауном для производительности)
         self.enemy_spawn_cooldown -= dt
@@ -538,46 +746,45 @@ class Game:
         if self.player.is_dead():
             self.game_over = True
     
-    def _update_enemy_highlight(self, location):
+    def _update_enemy_highlight(self, location, mouse_world_x, mouse_world_y):
         """Обновление подсветки врагов при наведении"""
         if not location or not location.enemies:
             return
         
-        mouse_screen_x, mouse_screen_y = self.input_handler.get_mouse_pos()
-        mouse_world_x, mouse_world_y = self.camera.screen_to_world(
-            mouse_screen_x, mouse_screen_y, self.iso_converter
+        # Видимая область в мировых координатах (с запасом на радиус наведения)
+        hover_radius = 1.0
+        min_x, min_y, max_x, max_y = self.camera.get_world_bounds(
+            self.iso_converter, margin=hover_radius
         )
         
         # Сброс подсветки
         for enemy in location.enemies:
             enemy.set_highlighted(False)
         
-        # Проверка наведения
+        # Проверка наведения (только враги на экране - мышь не может навестись на остальных)
         for enemy in location.enemies:
-            if enemy.check_mouse_hover(mouse_world_x, mouse_world_y):
+            if not (min_x <= enemy.world_x <= max_x and min_y <= enemy.world_y <= max_y):
+                continue
+            if enemy.check_mouse_hover(mouse_world_x, mouse_world_y, hover_radius):
                 enemy.set_highlighted(True)
                 break
     
-    def _handle_player_attacks(self, location):
-        """Обработка атак игрока"""
+    def _handle_player_attacks(self, location, mouse_world_x, mouse_world_y):
+        """Обработка атак игрока (цель - позиция курсора в мировых координатах)"""
         player_x, player_y = self.player.get_position()
         enemies_list = location.enemies if location else []
         
         # ЛКМ - атака
         if self.input_handler.is_mouse_button_just_pressed('left'):
-            mouse_screen_x, mouse_screen_y = self.input_handler.get_mouse_pos()
-            attack_target_x, attack_target_y = self.camera.screen_to_world(
-                mouse_screen_x, mouse_screen_y, self.iso_converter
-            )
             if self.combat_system.perform_attack(
                 player_x, player_y, self.player.angle,
-                attack_target_x, attack_target_y, enemies_list
+                mouse_world_x, mouse_world_y, enemies_list
             ):
                 # Запускаем анимацию атаки с поворотом к цели
                 self.player.play_attack_animation(
                     is_melee=self.combat_system.is_melee_mode,
-                    target_world_x=attack_target_x,
-                    target_world_y=attack_target_y
+                    target_world_x=mouse_world_x,
+                    target_world_y=mouse_world_y
                 )
         
         # Клавиша 2 - переключение режима боя
@@ -585,58 +792,66 @@ class Game:
             self.combat_system.set_melee_mode(not self.combat_system.is_melee_mode)
         
         # Способности (1, 3-9) - атакуют в направлении курсора
-        ability_keys = [
-            pygame.K_1, pygame.K_3, pygame.K_4, pygame.K_5,
-            pygame.K_6, pygame.K_7, pygame.K_8, pygame.K_9
-        ]
-        for key in ability_keys:
-            if self.input_handler.is_key_just_pressed(key):
-                # Получаем позицию курсора для направления
-                mouse_screen_x, mouse_screen_y = self.input_handler.get_mouse_pos()
-                ability_target_x, ability_target_y = self.camera.screen_to_world(
-                    mouse_screen_x, mouse_screen_y, self.iso_converter
+        # Все клавиши проверяются одним вызовом; без нажатий выходим сразу
+        ability_mask = self.input_handler.just_pressed_bitmask(ABILITY_KEYS)
+        if not ability_mask:
+            return
+        
+        # Каждая нажатая способность - отдельная атака на курсор
+        for _ in range(bin(ability_mask).count('1')):
+            if self.combat_system.perform_attack(
+                player_x, player_y, self.player.angle,
+                mouse_world_x, mouse_world_y, enemies_list
+            ):
+                self.player.play_attack_animation(
+                    is_melee=self.combat_system.is_melee_mode,
+                    target_world_x=mouse_world_x,
+                    target_world_y=mouse_world_y
                 )
-                if self.combat_system.perform_attack(
-                    player_x, player_y, self.player.angle,
-                    ability_target_x, ability_target_y, enemies_list
-                ):
-                    self.player.play_attack_animation(
-                        is_melee=self.combat_system.is_melee_mode,
-                        target_world_x=ability_target_x,
-                        target_world_y=ability_target_y
-                    )
+    
+    @staticmethod
+    def _build_move_lut():
+        """
+        Строит таблицу направлений движения для всех 16 комбинаций клавиш WASD
+        
+        Индекс - битовая маска: W | A << 1 | S << 2 | D << 3
+        Значение - направление в мировых координатах (или None, если движения нет)
+        """
+        lut = []
+        for mask in range(16):
+            # Экранные направления
+            screen_up = float(mask & 1)
+            screen_left = float((mask >> 1) & 1)
+            screen_down = float((mask >> 2) & 1)
+            screen_right = float((mask >> 3) & 1)
+            
+            # Преобразование экранных направлений в мировые координаты (изометрия)
+            # Вверх на экране = (-1, -1) в мировых
+            # Вниз на экране = (+1, +1) в мировых
+            # Вправо на экране = (+1, -1) в мировых
+            # Влево на экране = (-1, +1) в мировых
+            # Общие слагаемые: вертикаль и горизонталь экрана
+            vertical = screen_down - screen_up
+            horizontal = screen_right - screen_left
+            world_x = vertical + horizontal
+            world_y = vertical - horizontal
+            
+            if world_x != 0 or world_y != 0:
+                lut.append((world_x, world_y))
+            else:
+                lut.append(None)
+        return tuple(lut)
     
     def _get_keyboard_input(self):
         """Получение ввода с клавиатуры для движения (адаптировано под изометрию)"""
-        # Экранные направления
-        screen_up = 0.0
-        screen_down = 0.0
-        screen_left = 0.0
-        screen_right = 0.0
-        
-        if self.input_handler.is_key_pressed(pygame.K_w):
-            screen_up = 1.0
-        if self.input_handler.is_key_pressed(pygame.K_s):
-            screen_down = 1.0
-        if self.input_handler.is_key_pressed(pygame.K_a):
-            screen_left = 1.0
-        if self.input_handler.is_key_pressed(pygame.K_d):
-            screen_right = 1.0
-        
-        # Преобразование экранных направлений в мировые координаты (изометрия)
-        # Вверх на экране = (-1, -1) в мировых
-        # Вниз на экране = (+1, +1) в мировых
-        # Вправо на экране = (+1, -1) в мировых
-        # Влево на экране = (-1, +1) в мировых
-        world_x = 0.0
-        world_y = 0.0
-        
-        world_x += -screen_up + screen_down + screen_right - screen_left
-        world_y += -screen_up + screen_down - screen_right + screen_left
-        
-        if world_x != 0 or world_y != 0:
-            return (world_x, world_y)
-        return None
+        is_pressed = self.input_handler.is_key_pressed
+        mask = (
+            is_pressed(pygame.K_w)
+            | is_pressed(pygame.K_a) << 1
+            | is_pressed(pygame.K_s) << 2
+            | is_pressed(pygame.K_d) << 3
+        )
+        return self.move_lut[mask]
     
     def _update_procedural_enemy_spawn(self, location, player_x, player_y):
         """
@@ -650,6 +865,10 @@ class Game:
         if not location:
             return
         
+        # Лимит врагов уже достигнут (обычное состояние в игре) - ничего не делаем
+        if len(location.enemies) >= self.max_enemies:
+            return
+        
         level = self.level_manager.get_current_level()
         if not level or not level.procedural or not level.procedural_generator:
             return
@@ -662,77 +881,107 @@ class Game:
             player_x, player_y, spawn_check_radius
         )
         
-        # Создаем множество уже заспавненных позиций (чтобы не дублировать)
-        spawned_positions = set()
-        for enemy in location.enemies:
-            ex, ey = enemy.get_position()
-            # Используем более грубую сетку для проверки (каждые 5 тайлов)
-            grid_x = int(ex // 5) * 5
-            grid_y = int(ey // 5) * 5
-            spawned_positions.add((grid_x, grid_y))
-        
-        # Получаем все типы врагов кроме default
-        from game.enemy import get_enemy_types
-        enemy_types = get_enemy_types()
-        available_enemy_types = [eid for eid in enemy_types.keys() if eid != 'default']
+        # Все типы врагов кроме default (кэшируются, а не собираются каждый тик)
+        available_enemy_types = self.available_enemy_types
         
         if not available_enemy_types:
             return
         
-        # Максимальное количество врагов (из настроек)
-        max_enemies = self.max_enemies
+        # Сначала чистая фильтрация точек (только числа, без создания объектов),
+        # затем создаём врагов лишь на принятых позициях
+        enemy_positions = [enemy.get_position() for enemy in location.enemies]
+        accepted_positions = self._filter_spawn_points(
+            spawn_points, enemy_positions, player_x, player_y,
+            limit=self.max_enemies - len(location.enemies)
+        )
         
-        # Спавним врагов на точках спавна
-        for x, y, biome in spawn_points:
-            # Проверяем, не превышен ли лимит
-            if len(location.enemies) >= max_enemies:
-                break
+        # Спавним врагов на отобранных точках
+        for x, y in accepted_positions:
+            # Случайно выбираем тип врага
+            enemy_type = random.choice(available_enemy_types)
             
-            # Проверяем расстояние от игрока (не спавним слишком близко)
-            # Уменьшено, чтобы враги были видны в радиусе тумана войны (12 тайлов)
+            # Создаем врага (из пула)
+            enemy = self.enemy_pool.acquire(x, y, enemy_type=enemy_type)
+            location.enemies.append(enemy)
+    
+    @classmethod
+    def _filter_spawn_points(cls, spawn_points, enemy_positions, player_x, player_y, limit,
+                             min_player_distance=15.0, max_player_distance=30.0,
+                             min_enemy_distance=8.0):
+        """
+        Отбирает точки спавна врагов (чистая функция, без побочных эффектов)
+        
+        Точка принимается, если расстояние до игрока в пределах
+        [min_player_distance, max_player_distance] и ближе min_enemy_distance нет
+        ни существующих врагов, ни уже принятых точек.
+        
+        Args:
+            spawn_points: Список точек спавна [(x, y, data), ...]
+            enemy_positions: Позиции существующих врагов [(x, y), ...]
+            player_x, player_y: Позиция игрока
+            limit: Максимальное количество принятых точек
+            min_player_distance: Не спавним ближе к игроку (15 тайлов)
+            max_player_distance: Не спавним дальше от игрока (30 тайлов - в радиусе тумана войны)
+            min_enemy_distance: Минимальное расстояние между врагами (8 тайлов)
+        
+        Returns:
+            list: Принятые позиции [(x, y), ...] в порядке точек спавна
+        """
+        accepted = []
+        if limit <= 0:
+            return accepted
+        
+        min_player_distance_sq = min_player_distance * min_player_distance
+        max_player_distance_sq = max_player_distance * max_player_distance
+        min_enemy_distance_sq = min_enemy_distance * min_enemy_distance
+        
+        # Пространственная сетка врагов с ячейкой min_enemy_distance: {(cell_x, cell_y): [(x, y), ...]}
+        # Все враги ближе min_enemy_distance к точке лежат в соседних 3x3 ячейках
+        enemy_grid = {}
+        for ex, ey in enemy_positions:
+            cell = (int(ex // min_enemy_distance), int(ey // min_enemy_distance))
+            enemy_grid.setdefault(cell, []).append((ex, ey))
+        
+        for x, y, _ in spawn_points:
+            # Расстояние до игрока (без sqrt)
             dx = x - player_x
             dy = y - player_y
             distance_sq = dx * dx + dy * dy
-            
-            # Минимальное расстояние 15 тайлов, максимальное 30 тайлов (чтобы были видны)
-            if distance_sq < 15.0 * 15.0:  # Минимальное расстояние 15 тайлов от игрока
-                continue
-            if distance_sq > 30.0 * 30.0:  # Максимальное расстояние 30 тайлов (чтобы были видны)
+            if distance_sq < min_player_distance_sq or distance_sq > max_player_distance_sq:
                 continue
             
-            # Проверяем, нет ли врага слишком близко (минимальное расстояние между врагами) - УВЕЛИЧЕНО
-            grid_x = int(x // 5) * 5
-            grid_y = int(y // 5) * 5
-            if (grid_x, grid_y) in spawned_positions:
+            # Расстояние до других врагов - только в соседних ячейках сетки
+            cell_x = int(x // min_enemy_distance)
+            cell_y = int(y // min_enemy_distance)
+            if cls._has_enemy_nearby(enemy_grid, cell_x, cell_y, x, y, min_enemy_distance_sq):
                 continue
             
-            # Проверяем расстояние до других врагов - УВЕЛИЧЕНО
-            too_close = False
-            min_enemy_distance_sq = 8.0 * 8.0  # Минимальное расстояние 8 тайлов между врагами
-            for enemy in location.enemies:
-                ex, ey = enemy.get_position()
-                edx = x - ex
-                edy = y - ey
-                enemy_distance_sq = edx * edx + edy * edy
-                if enemy_distance_sq < min_enemy_distance_sq:
-                    too_close = True
-                    break
-            
-            if too_close:
-                continue
-            
-            # Случайно выбираем тип врага
-            enemy_type = random.choice(available_enemy_types)
-            
-            # Создаем врага
-            from game.enemy import create_enemy
-            enemy = create_enemy(x, y, enemy_type=enemy_type)
-            location.enemies.append(enemy)
-            spawned_positions.add((grid_x, grid_y))
+            accepted.append((x, y))
+            if len(accepted) >= limit:
+                break
+            enemy_grid.setdefault((cell_x, cell_y), []).append((x, y))
+        
+        return accepted
+    
+    @staticmethod
+    def _has_enemy_nearby(enemy_grid, cell_x, cell_y, x, y, min_distance_sq):
+        """Проверяет, есть ли в соседних ячейках сетки враг ближе min_distance"""
+        for ncx in (cell_x - 1, cell_x, cell_x + 1):
+            for ncy in (cell_y - 1, cell_y, cell_y + 1):
+                for ex, ey in enemy_grid.get((ncx, ncy), ()):
+                    dx = x - ex
+                    dy = y - ey
+                    if dx * dx + dy * dy < min_distance_sq:
+                        return True
+        return False
     
     def _update_location(self, location, dt, player_x, player_y):
         """Обновление локации и обработка атак врагов"""
-        for enemy in location.enemies[:]:
+        # Мёртвых врагов убираем уплотнением на месте (без копии списка каждый кадр):
+        # живые сдвигаются к началу, хвост отрезается после цикла
+        enemies = location.enemies
+        write_index = 0
+        for enemy in enemies:
             attack_info = enemy.update(dt, player_x, player_y)
             
             # Враг атакует игрока
@@ -747,9 +996,13 @@ class Game:
                     # Дальний бой - создаём снаряд врага
                     self._create_enemy_projectile(attack_info)
             
-            # Удаляем мёртвых врагов
+            # Удаляем мёртвых врагов (возвращаем в пул)
             if enemy.is_dead:
-                location.enemies.remove(enemy)
+                self.enemy_pool.release(enemy)
+            else:
+                enemies[write_index] = enemy
+                write_index += 1
+        del enemies[write_index:]
         
         # Обновление снарядов врагов
         self._update_enemy_projectiles(dt, player_x, player_y)
@@ -766,52 +1019,74 @@ class Game:
         target_y = attack_info['target_y']
         damage = attack_info['damage']
         
+        # Направление не меняется в полёте - скорость по осям считаем один раз
+        # (единичный вектор через hypot вместо atan2 + cos/sin каждый кадр)
+        speed = 10.0  # Скорость снаряда
         dx = target_x - start_x
         dy = target_y - start_y
-        angle = math.atan2(dy, dx)
-        
-        projectile = {
-            'x': start_x,
-            'y': start_y,
-            'angle': angle,
-            'speed': 10.0,  # Скорость снаряда
-            'damage': damage,
-            'range': 15.0,  # Максимальная дальность
-            'distance': 0.0,
-            'active': True,
-            'age': 0.0
-        }
+        length = math.hypot(dx, dy)
+        if length > 0:
+            vx = dx / length * speed
+            vy = dy / length * speed
+        else:
+            vx = speed
+            vy = 0.0
+        
+        # Переиспользуем отработавший снаряд, если есть
+        range_ = 15.0  # Максимальная дальность
+        if self.enemy_projectile_pool:
+            projectile = self.enemy_projectile_pool.pop()
+            projectile.reset(start_x, start_y, vx, vy, speed, damage, range_)
+        else:
+            projectile = EnemyProjectile(start_x, start_y, vx, vy, speed, damage, range_)
         
         self.enemy_projectiles.append(projectile)
     
     def _update_enemy_projectiles(self, dt, player_x, player_y):
-        """Обновляет снаряды врагов"""
-        for proj in self.enemy_projectiles[:]:
-            if not proj['active']:
-                self.enemy_projectiles.remove(proj)
-                continue
-            
-            proj['age'] += dt
-            
-            # Движение
-            move_dist = proj['speed'] * dt
-            proj['x'] += math.cos(proj['angle']) * move_dist
-            proj['y'] += math.sin(proj['angle']) * move_dist
-            proj['distance'] += move_dist
+        """
+        Обновляет снаряды врагов
+        
+        Движение, накопление дистанции, проверка попадания и удаление отработавших
+        снарядов выполняются за один проход; всё, что не меняется внутри цикла,
+        вынесено в локальные переменные.
+        """
+        # Радиус попадания сравниваем в квадрате - без sqrt на каждый снаряд
+        hit_radius_sq = 0.8 * 0.8
+        take_damage = self.player.take_damage
+        
+        # Отработавшие снаряды удаляем сразу: на их место ставим последний
+        # элемент списка и делаем pop (O(1), без копии списка и поиска remove)
+        projectiles = self.enemy_projectiles
+        pool = self.enemy_projectile_pool
+        count = len(projectiles)
+        i = 0
+        while i < count:
+            proj = projectiles[i]
+            proj.age += dt
             
-            # Проверка дальности
-            if proj['distance'] >= proj['range']:
-                proj['active'] = False
-                continue
+            # Движение (скорость по осям посчитана при создании)
+            x = proj.x + proj.vx * dt
+            y = proj.y + proj.vy * dt
+            distance = proj.distance + proj.speed * dt
+            proj.x = x
+            proj.y = y
+            proj.distance = distance
             
-            # Проверка попадания в игрока
-            dx = proj['x'] - player_x
-            dy = proj['y'] - player_y
-            dist_to_player = math.sqrt(dx * dx + dy * dy)
+            # Проверка дальности, затем попадания в игрока
+            if distance < proj.range:
+                dx = x - player_x
+                dy = y - player_y
+                if dx * dx + dy * dy >= hit_radius_sq:  # Радиус попадания 0.8
+                    i += 1
+                    continue
+                take_damage(proj.damage)
             
-            if dist_to_player < 0.8:  # Радиус попадания
-                self.player.take_damage(proj['damage'])
-                proj['active'] = False
+            # Swap-pop: текущий индекс не увеличиваем - на нём теперь другой снаряд
+            proj.active = False
+            count -= 1
+            projectiles[i] = projectiles[count]
+            projectiles.pop()
+            pool.append(proj)
     
     def _check_attack_hits(self, location):
         """Проверка попаданий атак по врагам"""
@@ -823,28 +1098,76 @@ class Game:
             if not attack.is_melee:
                 enemy.take_damage(attack.damage)
     
-    def _draw_enemy_projectiles(self, camera_offset):
-        """Отрисовка снарядов врагов"""
+    def _draw_enemy_projectiles(self, camera_offset, view_bounds=None):
+        """
+        Отрисовка снарядов врагов
+        
+        Args:
+            camera_offset: Смещение камеры (x, y)
+            view_bounds: Видимая область в мировых координатах (min_x, min_y, max_x, max_y)
+                         для отсечения снарядов за экраном (None - без отсечения)
+        """
+        if view_bounds is None:
+            view_bounds = (-math.inf, -math.inf, math.inf, math.inf)
+        min_x, min_y, max_x, max_y = view_bounds
+        
+        sprites = self.projectile_sprites
+        blit = self.screen.blit
+        # Изометрическая проекция встроена в цикл (та же формула, что в world_to_screen,
+        # но без вызова метода на каждый снаряд)
+        half_width = self.iso_converter.half_width
+        half_height = self.iso_converter.half_height
+        offset_x, offset_y = camera_offset
         for proj in self.enemy_projectiles:
-            if not proj['active']:
+            if not proj.active:
+                continue
+            
+            # Отсечение по видимой области до проекции и выбора спрайта
+            proj_x = proj.x
+            proj_y = proj.y
+            if not (min_x <= proj_x <= max_x and min_y <= proj_y <= max_y):
                 continue
             
-            screen_x, screen_y = self.iso_converter.world_to_screen(proj['x'], proj['y'])
-            screen_x += camera_offset[0]
-            screen_y += camera_offset[1]
+            # Проекция в целые пиксели плюс целое смещение камеры
+            center_x = int((proj_x - proj_y) * half_width) + offset_x
+            center_y = int((proj_x + proj_y) * half_height) + offset_y
             
             # Тёмный магический снаряд (фиолетовый/тёмный)
-            pulse = math.sin(proj['age'] * 15) * 2
+            pulse = math.sin(proj.age * 15) * 2
             size = int(6 + pulse)
             
-            # Внешнее свечение
-            pygame.draw.circle(self.screen, (80, 0, 120), (int(screen_x), int(screen_y)), size + 3)
-            # Среднее
-            pygame.draw.circle(self.screen, (140, 0, 200), (int(screen_x), int(screen_y)), size + 1)
-            # Ядро
-            pygame.draw.circle(self.screen, (200, 100, 255), (int(screen_x), int(screen_y)), size - 1)
-            # Центр
-            pygame.draw.circle(self.screen, (255, 200, 255), (int(screen_x), int(screen_y)), max(1, size - 3))
+            # Четыре круга запечены в спрайт - один blit вместо четырёх draw.circle
+            sprite_info = sprites.get(size)
+            if sprite_info is None:
+                sprite_info = sprites[size] = self._build_projectile_sprite(size)
+            sprite, half = sprite_info
+            blit(sprite, (center_x - half, center_y - half))
+    
+    @staticmethod
+    def _build_projectile_sprite(size):
+        """
+        Рисует спрайт снаряда врага заданного размера
+        
+        Args:
+            size: Размер ядра снаряда (с учётом пульсации)
+        
+        Returns:
+            tuple: (поверхность, смещение центра от левого верхнего угла)
+        """
+        # Запас в пиксель с каждой стороны, чтобы круги не обрезались краем
+        half = size + 3 + 1
+        sprite = pygame.Surface((half * 2 + 1, half * 2 + 1), pygame.SRCALPHA)
+        center = (half, half)
+        
+        # Внешнее свечение
+        pygame.draw.circle(sprite, (80, 0, 120), center, size + 3)
+        # Среднее
+        pygame.draw.circle(sprite, (140, 0, 200), center, size + 1)
+        # Ядро
+        pygame.draw.circle(sprite, (200, 100, 255), center, size - 1)
+        # Центр
+        pygame.draw.circle(sprite, (255, 200, 255), center, max(1, size - 3))
+        return sprite, half
     
     def _draw(self):
         """Отрисовка игры"""
@@ -873,9 +1196,13 @@ class Game:
                 level_tiles=level.tiles
             )
         
+        # Видимая область в мировых координатах - один раз на кадр для отсечения
+        # врагов и снарядов за пределами экрана
+        view_bounds = self.camera.get_world_bounds(self.iso_converter, margin=ENTITY_CULL_MARGIN)
+        
         # Локация (враги) - только видимые
         if current_location:
-            self._draw_visible_enemies(current_location, camera_offset)
+            self._draw_visible_enemies(current_location, camera_offset, view_bounds)
         
         # Персонаж
         self.player.draw(self.screen, self.iso_converter, camera_offset)
@@ -884,7 +1211,7 @@ class Game:
         self.combat_system.draw(self.screen, self.iso_converter, camera_offset)
         
         # Снаряды врагов
-        self._draw_enemy_projectiles(camera_offset)
+        self._draw_enemy_projectiles(camera_offset, view_bounds)
         
         # UI
         self._draw_ui(current_location)
@@ -893,44 +1220,80 @@ class Game:
         if self.game_over:
             self._draw_game_over()
     
+    @staticmethod
+    def _build_grid_screen_points(iso_converter, grid_size=15):
+        """
+        Проецирует точки сетки на экран (без смещения камеры)
+        
+        Args:
+            iso_converter: Конвертер изометрических координат
+            grid_size: Половина размера сетки в тайлах
+        
+        Returns:
+            tuple: Экранные координаты точек [(x, y), ...]
+        """
+        # Пропускаем каждый второй для производительности
+        return tuple(
+            iso_converter.world_to_screen(i, j)
+            for i in range(-grid_size, grid_size, 2)
+            for j in range(-grid_size, grid_size, 2)
+        )
+    
     def _draw_grid(self, location, camera_offset):
         """Отрисовка сетки (оптимизированная версия)"""
-        # Оптимизация: уменьшаем плотность сетки и используем более эффективную отрисовку
-        grid_size = 15  # Уменьшено для производительности
         grid_color = DARK_GRAY if not location or location.name == "field" else (20, 20, 30)
-        
-        # Предвычисляем границы экрана для оптимизации
-        screen_left = -100
-        screen_right = SCREEN_WIDTH + 100
-        screen_top = -100
-        screen_bottom = SCREEN_HEIGHT + 100
-        
-        # Рисуем только видимые точки сетки
-        for i in range(-grid_size, grid_size, 2):  # Пропускаем каждый второй для производительности
-            for j in range(-grid_size, grid_size, 2):
-                screen_x, screen_y = self.iso_converter.world_to_screen(i, j)
-                screen_x += camera_offset[0]
-                screen_y += camera_offset[1]
+        offset_x, offset_y = camera_offset
+        
+        # Точки спроецированы заранее; пишем пиксели через PixelArray (экран
+        # блокируется один раз, цвет переводится в формат поверхности один раз)
+        screen = self.screen
+        mapped_color = screen.map_rgb(grid_color)
+        with pygame.PixelArray(screen) as pixels:
+            for point_x, point_y in self.grid_screen_points:
+                screen_x = point_x + offset_x
+                screen_y = point_y + offset_y
                 
-                # Оптимизированная проверка видимости
-                if screen_left <= screen_x <= screen_right and screen_top <= screen_y <= screen_bottom:
-                    # Используем простые точки вместо кругов для лучшей производительности
-                    if 0 <= screen_x < SCREEN_WIDTH and 0 <= screen_y < SCREEN_HEIGHT:
-                        self.screen.set_at((int(screen_x), int(screen_y)), grid_color)
-    
-    def _draw_visible_enemies(self, location, camera_offset):
-        """Отрисовка только видимых врагов (в зоне видимости игрока)"""
+                # Рисуем только видимые точки (простые точки вместо кругов)
+                if 0 <= screen_x < SCREEN_WIDTH and 0 <= screen_y < SCREEN_HEIGHT:
+                    pixels[int(screen_x), int(screen_y)] = mapped_color
+    
+    def _draw_visible_enemies(self, location, camera_offset, view_bounds=None):
+        """
+        Отрисовка только видимых врагов (в зоне видимости игрока)
+        
+        Args:
+            location: Текущая локация
+            camera_offset: Смещение камеры (x, y)
+            view_bounds: Видимая область в мировых координатах (min_x, min_y, max_x, max_y)
+                         для отсечения врагов за экраном (None - без отсечения)
+        """
         if not location or not location.enemies:
             return
         
+        if view_bounds is None:
+            view_bounds = (-math.inf, -math.inf, math.inf, math.inf)
+        min_x, min_y, max_x, max_y = view_bounds
+        
+        # Круг видимости берём один раз на кадр и проверяем врагов без вызовов тумана
+        vision = self.fog_of_war.get_vision_circle()
+        if vision is None:
+            return
+        vision_x, vision_y, vision_radius_sq = vision
+        
         for enemy in location.enemies:
             if enemy.is_dead:
                 continue
             
             ex, ey = enemy.get_position()
             
+            # Сначала дешёвое отсечение по экрану, затем зона видимости
+            if not (min_x <= ex <= max_x and min_y <= ey <= max_y):
+                continue
+            
             # Проверяем, виден ли враг
-            if self.fog_of_war.is_position_visible(ex, ey):
+            dx = ex - vision_x
+            dy = ey - vision_y
+            if dx * dx + dy * dy <= vision_radius_sq:
                 enemy.draw(self.screen, self.iso_converter, camera_offset)
     
     def _draw_level(self, camera_offset):
@@ -954,13 +1317,87 @@ class Game:
         # Информация
         self._draw_info(location, player_x, player_y)
     
+    @staticmethod
+    def _build_minimap_tile_runs(tile_size):
+        """
+        Растеризует ромб тайла миникарты и раскладывает его на горизонтальные отрезки
+        
+        Args:
+            tile_size: Размер тайла на миникарте в пикселях
+        
+        Returns:
+            tuple: Отрезки ((offset_x, offset_y, width), ...) относительно центра тайла
+        """
+        half_width = tile_size // 2
+        half_height = tile_size // 4
+        width = half_width * 2 + 1
+        height = half_height * 2 + 1
+        
+        # Рисуем ромб тем же draw.polygon, что и раньше, на временной поверхности
+        scratch = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.polygon(scratch, WHITE, [
+            (half_width, 0),
+            (width - 1, half_height),
+            (half_width, height - 1),
+            (0, half_height)
+        ])
+        
+        runs = []
+        for y in range(height):
+            x = 0
+            while x < width:
+                if not scratch.get_at((x, y)).a:
+                    x += 1
+                    continue
+                start = x
+                while x < width and scratch.get_at((x, y)).a:
+                    x += 1
+                runs.append((start - half_width, y - half_height, x - start))
+        return tuple(runs)
+    
+    def _get_minimap_tile_colors(self, tileset_name):
+        """
+        Возвращает цвета тайлсета на миникарте (с кэшированием по имени)
+        
+        Args:
+            tileset_name: Имя тайлсета
+        
+        Returns:
+            tuple: (цвет видимого тайла, цвет исследованного но не видимого) -
+                   RGBA, уже упакованные в формат пикселей холста миникарты
+        """
+        colors = self.minimap_tileset_colors.get(tileset_name)
+        if colors is not None:
+            return colors
+        
+        name = tileset_name.lower()
+        if 'grass' in name:
+            base_color = (60, 120, 60)
+        elif 'dirt' in name:
+            base_color = (120, 80, 50)
+        elif 'sand' in name:
+            base_color = (180, 160, 100)
+        elif 'stone' in name:
+            base_color = (100, 100, 110)
+        elif 'forest' in name:
+            base_color = (40, 80, 40)
+        else:
+            base_color = (80, 80, 80)
+        
+        dim_color = tuple(int(c * 0.5) for c in base_color)
+        # Упаковываем один раз - fill не переводит кортеж в пиксель на каждый вызов
+        map_rgb = self.minimap_surface.map_rgb
+        colors = (map_rgb((*base_color, 255)), map_rgb((*dim_color, 180)))
+        self.minimap_tileset_colors[tileset_name] = colors
+        return colors
+    
     def _draw_minimap(self, location, player_x, player_y):
         """Отрисовка миникарты с туманом войны"""
         minimap_x = SCREEN_WIDTH - self.minimap_size - 10
         minimap_y = 10
         
-        # Создаём временную поверхность для миникарты
-        minimap_temp = pygame.Surface((self.minimap_size, self.minimap_size), pygame.SRCALPHA)
+        # Переиспользуем постоянный холст миникарты (без выделения поверхности каждый кадр)
+        minimap_temp = self.minimap_surface
         minimap_temp.fill((0, 0, 0, 220))
         
         # Центр миникарты
@@ -968,7 +1405,10 @@ class Game:
         minimap_center_y = self.minimap_size // 2
         
         # Масштаб: 1 тайл = несколько пикселей на миникарте
-        tile_size = 5
+        tile_size = self.minimap_tile_size
+        tile_runs = self.minimap_tile_runs
+        fill = minimap_temp.fill
+        tileset_colors = self.minimap_tileset_colors
         
         # Получаем исследованные и видимые тайлы
         explored_tiles = self.fog_of_war.get_explored_for_minimap()
@@ -979,27 +1419,28 @@ class Game:
         level = self.level_manager.get_current_level()
         if level and level.tiles:
             # Предварительная фильтрация по расстоянию для производительности
+            minimap_radius_sq = self.minimap_radius * self.minimap_radius
             tiles_for_minimap = []
-            for (tx, ty), tile_data in level.tiles.items():
+            for tile_pos, tile_data in level.tiles.items():
                 # Показываем только исследованные тайлы
-                if (tx, ty) not in explored_tiles:
+                if tile_pos not in explored_tiles:
                     continue
                 
                 # Позиция тайла относительно игрока
-                dx = tx - player_x
-                dy = ty - player_y
+                dx = tile_pos[0] - player_x
+                dy = tile_pos[1] - player_y
                 
                 # Проверяем расстояние для миникарты (быстрая проверка без sqrt)
                 distance_sq = dx * dx + dy * dy
-                if distance_sq > self.minimap_radius * self.minimap_radius:
+                if distance_sq > minimap_radius_sq:
                     continue
                 
-                tiles_for_minimap.append(((tx, ty), tile_data, distance_sq))
+                tiles_for_minimap.append((tile_pos, tile_data, distance_sq))
             
-            # Ограничиваем количество тайлов для миникарты (максимум 500)
+            # Ограничиваем количество тайлов для миникарты (максимум 500):
+            # частичный отбор ближайших через кучу вместо полной сортировки
             if len(tiles_for_minimap) > 500:
-                tiles_for_minimap.sort(key=lambda item: item[2])  # Сортируем по расстоянию
-                tiles_for_minimap = tiles_for_minimap[:500]  # Берем ближайшие
+                tiles_for_minimap = heapq.nsmallest(500, tiles_for_minimap, key=lambda item: item[2])
             
             # Отрисовываем отфильтрованные тайлы
             for (tx, ty), tile_data, _ in tiles_for_minimap:
@@ -1014,46 +1455,35 @@ class Game:
                 tile_minimap_x = minimap_center_x + iso_x
                 tile_minimap_y = minimap_center_y + iso_y
                 
-                # Получаем цвет тайла
+                # Получаем цвета тайла (яркий и тусклый) - считаются один раз на тайлсет
                 tileset_name = tile_data.get('tileset', '')
-                if 'grass' in tileset_name.lower():
-                    base_color = (60, 120, 60)
-                elif 'dirt' in tileset_name.lower():
-                    base_color = (120, 80, 50)
-                elif 'sand' in tileset_name.lower():
-                    base_color = (180, 160, 100)
-                elif 'stone' in tileset_name.lower():
-                    base_color = (100, 100, 110)
-                elif 'forest' in tileset_name.lower():
-                    base_color = (40, 80, 40)
-                else:
-                    base_color = (80, 80, 80)
+                tile_colors = tileset_colors.get(tileset_name)
+                if tile_colors is None:
+                    tile_colors = self._get_minimap_tile_colors(tileset_name)
                 
-                # Яркость зависит от видимости
-                if (tx, ty) in visible_tiles:
-                    # Видимый сейчас - яркий
-                    tile_color = (*base_color, 255)
-                else:
-                    # Исследованный но не видимый - тусклый
-                    dim_color = tuple(int(c * 0.5) for c in base_color)
-                    tile_color = (*dim_color, 180)
+                # Яркость зависит от видимости: видимый сейчас - яркий,
+                # исследованный но не видимый - тусклый
+                tile_color = tile_colors[0] if (tx, ty) in visible_tiles else tile_colors[1]
                 
-                # Рисуем ромб тайла
+                # Рисуем ромб тайла готовыми отрезками (fill не смешивает альфу,
+                # как и draw.polygon, но без построения многоугольника)
                 if 0 <= tile_minimap_x < self.minimap_size and 0 <= tile_minimap_y < self.minimap_size:
-                    points = [
-                        (tile_minimap_x, tile_minimap_y - tile_size // 4),
-                        (tile_minimap_x + tile_size // 2, tile_minimap_y),
-                        (tile_minimap_x, tile_minimap_y + tile_size // 4),
-                        (tile_minimap_x - tile_size // 2, tile_minimap_y)
-                    ]
-                    pygame.draw.polygon(minimap_temp, tile_color, points)
-        
-        # Игрок (яркая синяя точка в центре)
-        pygame.draw.circle(minimap_temp, (100, 180, 255), (minimap_center_x, minimap_center_y), 4)
-        pygame.draw.circle(minimap_temp, WHITE, (minimap_center_x, minimap_center_y), 4, 1)
-        
-        # Враги (только видимые!)
-        if location and location.enemies:
+                    for run_x, run_y, run_width in tile_runs:
+                        fill(tile_color, (tile_minimap_x + run_x, tile_minimap_y + run_y, run_width, 1))
+        
+        # Игрок (яркая синяя точка в центре, готовая поверхность)
+        player_dot_radius = self.minimap_player_dot_radius
+        minimap_temp.blit(self.minimap_player_dot,
+                          (minimap_center_x - player_dot_radius, minimap_center_y - player_dot_radius))
+        
+        # Враги (только видимые!) - собираем в список и рисуем одним blits
+        vision = self.fog_of_war.get_vision_circle()
+        if location and location.enemies and vision is not None:
+            vision_x, vision_y, vision_radius_sq = vision
+            minimap_radius_sq = self.minimap_radius * self.minimap_radius
+            dot = self.minimap_enemy_dot
+            dot_radius = self.minimap_enemy_dot_radius
+            enemy_dots = []
             for enemy in location.enemies:
                 if enemy.is_dead:
                     continue
@@ -1061,14 +1491,15 @@ class Game:
                 ex, ey = enemy.get_position()
                 
                 # Показываем врага только если он в зоне видимости
-                if not self.fog_of_war.is_position_visible(ex, ey):
+                dx = ex - vision_x
+                dy = ey - vision_y
+                if dx * dx + dy * dy > vision_radius_sq:
                     continue
                 
                 dx = ex - player_x
                 dy = ey - player_y
-                distance = math.sqrt(dx * dx + dy * dy)
                 
-                if distance <= self.minimap_radius:
+                if dx * dx + dy * dy <= minimap_radius_sq:
                     iso_x = (dx - dy) * tile_size // 2
                     iso_y = (dx + dy) * tile_size // 4
                     
@@ -1076,7 +1507,11 @@ class Game:
                     enemy_minimap_y = minimap_center_y + iso_y
                     
                     if 0 <= enemy_minimap_x < self.minimap_size and 0 <= enemy_minimap_y < self.minimap_size:
-                        pygame.draw.circle(minimap_temp, RED, (int(enemy_minimap_x), int(enemy_minimap_y)), 3)
+                        # blit сам отбрасывает дробную часть - int() не нужен
+                        enemy_dots.append((dot, (enemy_minimap_x - dot_radius, enemy_minimap_y - dot_radius)))
+            
+            if enemy_dots:
+                minimap_temp.blits(enemy_dots, doreturn=False)
         
         # Рамка миникарты
         pygame.draw.rect(minimap_temp, WHITE, (0, 0, self.minimap_size, self.minimap_size), 2)
@@ -1084,16 +1519,36 @@ class Game:
         # Отрисовываем миникарту на экран
         self.screen.blit(minimap_temp, (minimap_x, minimap_y))
     
+    def _render_info_line(self, slot, text, color):
+        """
+        Рендерит строку HUD, которая меняется со временем (FPS, позиция и т.п.)
+        
+        Для каждой строки хранится только последний вариант: поверхность
+        пересоздаётся лишь при изменении текста, а кэш не растёт.
+        
+        Args:
+            slot: Идентификатор строки
+            text: Текст
+            color: Цвет текста
+        """
+        cached = self.info_line_cache.get(slot)
+        if cached is not None and cached[0] == text and cached[1] == color:
+            return cached[2]
+        
+        surface = self.font_medium.render(text, True, color)
+        self.info_line_cache[slot] = (text, color, surface)
+        return surface
+    
     def _draw_info(self, location, player_x, player_y):
         """Отрисовка информации"""
-        # FPS и позиция
-        fps_text = self.font_medium.render(f"FPS: {int(self.clock.get_fps())}", True, WHITE)
-        pos_text = self.font_medium.render(f"Позиция: ({player_x:.1f}, {player_y:.1f})", True, WHITE)
-        location_text = self.font_medium.render(
-            f"Локация: {location.name if location else 'None'}", True, WHITE
+        # FPS и позиция (перерисовываются только при изменении значений)
+        fps_text = self._render_info_line("fps", f"FPS: {int(self.clock.get_fps())}", WHITE)
+        pos_text = self._render_info_line("pos", f"Позиция: ({player_x:.1f}, {player_y:.1f})", WHITE)
+        location_text = self._render_info_line(
+            "location", f"Локация: {location.name if location else 'None'}", WHITE
         )
-        mode_text = self.font_medium.render(
-            f"Режим боя: {'Ближний' if self.combat_system.is_melee_mode else 'Дальний'}", True, WHITE
+        mode_text = self._render_info_line(
+            "mode", f"Режим боя: {'Ближний' if self.combat_system.is_melee_mode else 'Дальний'}", WHITE
         )
         
         self.screen.blit(fps_text, (10, 10))
@@ -1105,49 +1560,25 @@ class Game:
         if self.enemies_enabled:
             current_location = self.location_manager.get_current_location()
             current_enemies = len(current_location.enemies) if current_location else 0
-            enemy_settings_text = self.font_medium.render(
+            enemy_settings_text = self._render_info_line(
+                "enemies",
                 f"Враги: {current_enemies}/{self.max_enemies} (частота: {self.enemy_spawn_frequency:.1f}с)", 
-                True, (150, 255, 150)
+                (150, 255, 150)
             )
             self.screen.blit(enemy_settings_text, (10, 110))
         
-        # Управление
-        controls = [
-            "Управление:",
-            "WASD - движение",
-            "ЛКМ - атака",
-            "Клавиша 2 - переключение ближний/дальний бой",
-            "Клавиши 1, 3-9 - способности",
-            "ESC - меню"
-        ]
+        # Управление (статичный блок - одна готовая поверхность)
         y_offset = 135 if self.enemies_enabled else 110
-        for text in controls:
-            rendered = self.font_medium.render(text, True, GRAY)
-            self.screen.blit(rendered, (10, y_offset))
-            y_offset += 25
-        
-        # Управление настройками врагов (если включены)
-        if self.enemies_enabled:
-            enemy_controls = [
-                "Настройки врагов:",
-                "+/- - частота спавна",
-                "[/] - макс. количество"
-            ]
-            for text in enemy_controls:
-                rendered = self.font_medium.render(text, True, (150, 255, 150))
-                self.screen.blit(rendered, (10, y_offset))
-                y_offset += 25
+        self.screen.blit(self.controls_surfaces[self.enemies_enabled], (10, y_offset))
     
     def _draw_game_over(self):
         """Отрисовка экрана Game Over"""
-        # Затемнение
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+        # Затемнение (готовая поверхность)
+        self.screen.blit(self.dim_overlay, (0, 0))
         
         # Текст
-        game_over_text = self.font_large.render("GAME OVER", True, RED)
-        restart_text = self.font_medium.render("Нажмите R для перезапуска", True, WHITE)
+        game_over_text = self._render_text("GAME OVER", self.font_large, RED)
+        restart_text = self._render_text("Нажмите R для перезапуска", self.font_medium, WHITE)
         
         game_over_rect = game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
         restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20))
@@ -1155,13 +1586,40 @@ class Game:
         self.screen.blit(game_over_text, game_over_rect)
         self.screen.blit(restart_text, restart_rect)
     
+    def _draw_paused_frame(self):
+        """
+        Отрисовка кадра на паузе
+        
+        Мир и затемнение рисуются один раз в снимок pause_background. В следующих
+        кадрах из снимка восстанавливаются только области прошлого меню, меню
+        рисуется заново, а на экране обновляются лишь изменившиеся прямоугольники.
+        """
+        first_frame = self.pause_background is None
+        if first_frame:
+            self._draw()
+            # Затемнение (готовая поверхность)
+            self.screen.blit(self.dim_overlay, (0, 0))
+            self.pause_background = self.screen.copy()
+        else:
+            # Стираем прошлое меню, восстанавливая фон под ним
+            for rect in self.menu_dirty_rects:
+                self.screen.blit(self.pause_background, rect, rect)
+        
+        previous_rects = self.menu_dirty_rects
+        self.menu_dirty_rects = []
+        self._draw_pause_menu()
+        
+        if first_frame:
+            pygame.display.flip()
+        else:
+            pygame.display.update(previous_rects + self.menu_dirty_rects)
+    
+    def _blit_menu(self, surface, dest):
+        """Рисует элемент меню и запоминает его область для обновления экрана"""
+        self.menu_dirty_rects.append(self.screen.blit(surface, dest))
+    
     def _draw_pause_menu(self):
         """Отрисовка меню паузы"""
-        # Затемнение
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
-        
         if self.in_level_submenu:
             self._draw_level_submenu()
         elif self.in_enemy_submenu:
@@ -1172,9 +1630,9 @@ class Game:
     def _draw_main_menu(self):
         """Отрисовка главного меню паузы"""
         # Заголовок
-        title = self.font_large.render("ПАУЗА", True, WHITE)
+        title = self._render_text("ПАУЗА", self.font_large, WHITE)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 150))
-        self.screen.blit(title, title_rect)
+        self._blit_menu(title, title_rect)
         
         # Пункты меню
         menu_y = 220
@@ -1189,40 +1647,40 @@ class Game:
                 suffix = "  "
             
             # Получаем текст пункта меню (может быть функцией)
-            menu_text = item['text']
+            menu_text = item.text
             if callable(menu_text):
                 menu_text = menu_text()
             
             # Для настроек добавляем стрелки только если выбраны
-            if item.get("type") == "setting" and i == self.selected_menu_item:
+            if item.type == "setting" and i == self.selected_menu_item:
                 menu_text = f"◄ {menu_text} ►"
             
-            text = self.font_medium.render(f"{prefix}{menu_text}{suffix}", True, color)
+            text = self._render_text(f"{prefix}{menu_text}{suffix}", self.font_medium, color)
             text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, menu_y))
-            self.screen.blit(text, text_rect)
+            self._blit_menu(text, text_rect)
             menu_y += 40
         
         # Подсказка (динамическая, в зависимости от выбранного пункта)
         selected_item = self.menu_items[self.selected_menu_item] if self.menu_items else None
-        if selected_item and selected_item.get("type") == "setting":
+        if selected_item and selected_item.type == "setting":
             hint_text = "←/→ или A/D - изменение настройки, ESC - закрыть"
         else:
             hint_text = "W/S или ↑/↓ - выбор, Enter - подтверждение, ESC - закрыть"
-        hint = self.font_small.render(hint_text, True, GRAY)
+        hint = self._render_text(hint_text, self.font_small, GRAY)
         hint_rect = hint.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 50))
-        self.screen.blit(hint, hint_rect)
+        self._blit_menu(hint, hint_rect)
     
     def _draw_level_submenu(self):
         """Отрисовка подменю уровней"""
         # Заголовок
-        title = self.font_large.render("УРОВНИ", True, WHITE)
+        title = self._render_text("УРОВНИ", self.font_large, WHITE)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 100))
-        self.screen.blit(title, title_rect)
+        self._blit_menu(title, title_rect)
         
         # Подсказка
-        subtitle = self.font_small.render("Выберите уровень для загрузки", True, GRAY)
+        subtitle = self._render_text("Выберите уровень для загрузки", self.font_small, GRAY)
         subtitle_rect = subtitle.get_rect(center=(SCREEN_WIDTH // 2, 135))
-        self.screen.blit(subtitle, subtitle_rect)
+        self._blit_menu(subtitle, subtitle_rect)
         
         # Пункты подменю
         menu_y = 180
@@ -1236,27 +1694,27 @@ class Game:
                 prefix = "  "
                 suffix = "  "
             
-            text = self.font_medium.render(f"{prefix}{item['text']}{suffix}", True, color)
+            text = self._render_text(f"{prefix}{item.text}{suffix}", self.font_medium, color)
             text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, menu_y))
-            self.screen.blit(text, text_rect)
+            self._blit_menu(text, text_rect)
             menu_y += 30
         
         # Подсказка навигации
-        nav_hint = self.font_small.render("← Назад | ↑↓ Выбор | Enter Загрузить", True, GRAY)
+        nav_hint = self._render_text("← Назад | ↑↓ Выбор | Enter Загрузить", self.font_small, GRAY)
         nav_rect = nav_hint.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 50))
-        self.screen.blit(nav_hint, nav_rect)
+        self._blit_menu(nav_hint, nav_rect)
     
     def _draw_enemy_submenu(self):
         """Отрисовка подменю противников"""
         # Заголовок
-        title = self.font_large.render("ПРОТИВНИКИ", True, WHITE)
+        title = self._render_text("ПРОТИВНИКИ", self.font_large, WHITE)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, 100))
-        self.screen.blit(title, title_rect)
+        self._blit_menu(title, title_rect)
         
         # Подсказка
-        subtitle = self.font_small.render("Выберите тип врага для спавна", True, GRAY)
+        subtitle = self._render_text("Выберите тип врага для спавна", self.font_small, GRAY)
         subtitle_rect = subtitle.get_rect(center=(SCREEN_WIDTH // 2, 135))
-        self.screen.blit(subtitle, subtitle_rect)
+        self._blit_menu(subtitle, subtitle_rect)
         
         # Пункты подменю (с прокруткой если много)
         visible_items = 12
@@ -1280,9 +1738,9 @@ class Game:
                 suffix = "  "
             
             # Цветной индикатор для типов врагов
-            if item.get("type"):
+            if item.type:
                 enemy_types = get_enemy_types()
-                enemy_data = enemy_types.get(item["type"], {})
+                enemy_data = enemy_types.get(item.type, {})
                 enemy_color = enemy_data.get('color', (200, 50, 50))
                 if isinstance(enemy_color, list):
                     enemy_color = tuple(enemy_color)
@@ -1292,25 +1750,26 @@ class Game:
                 indicator_rect = pygame.Rect(indicator_x, menu_y - 8, 16, 16)
                 pygame.draw.rect(self.screen, enemy_color, indicator_rect)
                 pygame.draw.rect(self.screen, WHITE, indicator_rect, 1)
+                self.menu_dirty_rects.append(indicator_rect)
             
-            text = self.font_medium.render(f"{prefix}{item['text']}{suffix}", True, color)
+            text = self._render_text(f"{prefix}{item.text}{suffix}", self.font_medium, color)
             text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, menu_y))
-            self.screen.blit(text, text_rect)
+            self._blit_menu(text, text_rect)
             menu_y += 35
         
         # Индикатор прокрутки
         if start_idx > 0:
-            arrow_up = self.font_medium.render("▲", True, GRAY)
-            self.screen.blit(arrow_up, (SCREEN_WIDTH // 2 - 8, 160))
+            arrow_up = self._render_text("▲", self.font_medium, GRAY)
+            self._blit_menu(arrow_up, (SCREEN_WIDTH // 2 - 8, 160))
         
         if end_idx < len(self.enemy_submenu_items):
-            arrow_down = self.font_medium.render("▼", True, GRAY)
-            self.screen.blit(arrow_down, (SCREEN_WIDTH // 2 - 8, menu_y + 5))
+            arrow_down = self._render_text("▼", self.font_medium, GRAY)
+            self._blit_menu(arrow_down, (SCREEN_WIDTH // 2 - 8, menu_y + 5))
         
         # Подсказка
-        hint = self.font_small.render("W/S - выбор, Enter - спавн, ← или ESC - назад", True, GRAY)
+        hint = self._render_text("W/S - выбор, Enter - спавн, ← или ESC - назад", self.font_small, GRAY)
         hint_rect = hint.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 50))
-        self.screen.blit(hint, hint_rect)
+        self._blit_menu(hint, hint_rect)
     
 
 
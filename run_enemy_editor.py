@@ -31,4 +31,5 @@ if __name__ == '__main__':
     print("🌐 Откройте в браузере: http://localhost:5000")
     print("⏹️  Нажмите Ctrl+C для остановки")
     print("=" * 50)
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    # Отладчик и автоперезагрузка Werkzeug - только по DIABRO_EDITOR_DEBUG=1
+    app.run(debug=os.environ.get('DIABRO_EDITOR_DEBUG') == '1', port=5000)
\ No newline at end of file
@@ -0,0 +1,23 @@
+import pytest
+
+from game.level import unpack_level_tiles
+
+
+def _legacy(*keys):
+    return {'tiles': {key: {'tileset': 'grass', 'tile': 0} for key in keys}}
+
+
+def test_unpack_legacy_tiles():
+    tiles = unpack_level_tiles(_legacy('1,2', '-3,4'))
+    assert set(tiles) == {(1, 2), (-3, 4)}
+    assert tiles[1, 2] == {'tileset': 'grass', 'tile': 0}
+
+
+def test_unpack_legacy_tiles_leading_zeros():
+    assert set(unpack_level_tiles(_legacy('01,2', '3,04'))) == {(1, 2), (3, 4)}
+
+
+@pytest.mark.parametrize('keys', [('1,2,3', '4'), ('1', '2,3,4'), ('a,b',)])
+def test_unpack_legacy_tiles_invalid_key(keys):
+    with pytest.raises(ValueError):
+        unpack_level_tiles(_legacy(*keys))
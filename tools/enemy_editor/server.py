@@ -1,34 +1,112 @@
 """
 Веб-редактор типов врагов для DiaBRO
 Запуск: python tools/enemy_editor/server.py
+Отладка (отладчик + автоперезагрузка): DIABRO_EDITOR_DEBUG=1 python tools/enemy_editor/server.py
+Через WSGI-сервер: gunicorn -k gthread -w 1 --threads 8 tools.enemy_editor.server:app
+(один процесс: кэш типов врагов и отложенная запись живут в памяти процесса)
 """
 import os
 import sys
+import copy
 import json
+import stat
 import shutil
+import atexit
+import functools
+import mimetypes
+import threading
 from pathlib import Path
+from urllib.parse import quote
 
 # Добавляем корень проекта в путь
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_from_directory, abort
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
 
+# orjson (Rust) в разы быстрее стандартного json; если не установлен - работаем на json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# watchdog позволяет узнавать об изменении enemy_types.json без stat на каждый запрос
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+# Сжатие ответов (Brotli/gzip) - тоже необязательная зависимость
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON-провайдер Flask на orjson (для jsonify и request.json)"""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__, 
             template_folder='templates',
             static_folder='static')
 
+if orjson is not None:
+    app.json = ORJSONProvider(app)
+
 # Конфигурация
 ENEMY_SPRITES_DIR = PROJECT_ROOT / 'game' / 'images' / 'enemy'
 WEAPON_SPRITES_DIR = PROJECT_ROOT / 'game' / 'images' / 'weapon'
 TEXTURES_DIR = PROJECT_ROOT / 'game' / 'images' / 'textures'
 LEVELS_DIR = PROJECT_ROOT / 'game' / 'levels'
 ENEMY_CONFIG_FILE = PROJECT_ROOT / 'game' / 'enemy_types.json'
-ALLOWED_EXTENSIONS = {'png'}
+ALLOWED_EXTENSIONS = frozenset({'png'})
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'  # Первые 8 байт любого PNG-файла
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max
+UPLOAD_CHUNK_SIZE = 64 * 1024  # Размер блока при записи загрузок на диск
+SAVE_DEBOUNCE_SECONDS = 0.5  # Задержка записи enemy_types.json после изменения
+
+# Распарсенный enemy_types.json и st_mtime_ns файла, из которого он прочитан
+# (watched - файл отслеживается через watchdog, проверять mtime не нужно;
+# dirty - в памяти есть изменения, ещё не записанные на диск)
+_enemy_types_cache = {'mtime': None, 'data': None, 'watched': None, 'dirty': False, 'flush_timer': None}
+_enemy_types_lock = threading.Lock()
+# Сериализует изменения типов врагов (чтение-изменение-запись целиком)
+_enemy_types_edit_lock = threading.Lock()
+# Списки PNG-файлов по директориям: {Path: (st_mtime_ns, [имена])}
+_png_list_cache = {}
 
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+# Отдача изображений через веб-сервер (sendfile без копирования через Python):
+# DIABRO_EDITOR_X_SENDFILE=1 - заголовок X-Sendfile (Apache, lighttpd);
+# DIABRO_EDITOR_X_ACCEL_PREFIX=/internal - X-Accel-Redirect для nginx, где
+# internal-локация с этим префиксом указывает (alias) на корень проекта
+app.config['USE_X_SENDFILE'] = os.environ.get('DIABRO_EDITOR_X_SENDFILE') == '1'
+app.config['X_ACCEL_PREFIX'] = os.environ.get('DIABRO_EDITOR_X_ACCEL_PREFIX', '').rstrip('/')
+# Сжимаем только текстовые ответы (PNG уже сжат), Brotli предпочтительнее gzip
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 512
+app.config['COMPRESS_MIMETYPES'] = [
+    'application/json', 'text/plain', 'text/html', 'text/css', 'application/javascript'
+]
+
+if Compress is not None:
+    Compress(app)
 
 # Создаём директории если не существуют
 ENEMY_SPRITES_DIR.mkdir(parents=True, exist_ok=True)
@@ -36,50 +114,282 @@ TEXTURES_DIR.mkdir(parents=True, exist_ok=True)
 LEVELS_DIR.mkdir(parents=True, exist_ok=True)
 
 
+@functools.lru_cache(maxsize=1024)
 def allowed_file(filename):
     """Проверяет допустимое расширение файла"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def load_enemy_types():
-    """Загружает конфигурацию типов врагов"""
-    if ENEMY_CONFIG_FILE.exists():
-        with open(ENEMY_CONFIG_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+# Нормализация имён файлов с кэшем (клиенты повторяют одни и те же имена)
+cached_secure_filename = functools.lru_cache(maxsize=1024)(secure_filename)
+
+
+def read_json_file(path):
+    """Читает JSON-файл (через orjson, если он доступен)"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+def dump_json_bytes(data):
+    """Сериализует данные в UTF-8 JSON с отступом 2 (через orjson, если он доступен)"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+class EnemyTypesWatcher(FileSystemEventHandler):
+    """Сбрасывает кэш типов врагов при любом изменении enemy_types.json на диске"""
+    
+    def on_any_event(self, event):
+        paths = (event.src_path, getattr(event, 'dest_path', ''))
+        if any(os.path.basename(os.fsdecode(path)) == ENEMY_CONFIG_FILE.name for path in paths):
+            with _enemy_types_lock:
+                # Несохранённые изменения из памяти не теряем - их всё равно запишет flush
+                if _enemy_types_cache['dirty']:
+                    return
+                # Событие от собственного сохранения сервера: кэш уже совпадает с файлом
+                try:
+                    if ENEMY_CONFIG_FILE.stat().st_mtime_ns == _enemy_types_cache['mtime']:
+                        return
+                except OSError:
+                    pass
+                _enemy_types_cache['mtime'] = None
+                _enemy_types_cache['data'] = None
+
+
+def start_enemy_types_watcher():
+    """
+    Запускает отслеживание enemy_types.json (вызывается под _enemy_types_lock)
+    
+    Returns:
+        bool: True, если наблюдатель запущен (без watchdog - False)
+    """
+    if Observer is None:
+        return False
+    
+    try:
+        observer = Observer()
+        observer.schedule(EnemyTypesWatcher(), str(ENEMY_CONFIG_FILE.parent), recursive=False)
+        observer.daemon = True
+        observer.start()
+    except OSError:
+        return False
+    return True
+
+
+def load_enemy_types(mutable=False):
+    """
+    Загружает конфигурацию типов врагов
+    
+    Распарсенный словарь хранится в памяти. Если доступен watchdog, кэш
+    сбрасывается по событию изменения файла и горячий путь обходится без
+    обращений к диску; иначе файл перечитывается при изменении его mtime.
+    
+    Args:
+        mutable: Вернуть глубокую копию, которую можно менять перед save_enemy_types
+                 (кэшированный словарь изменять нельзя)
+    """
+    with _enemy_types_lock:
+        if _enemy_types_cache['watched'] is None:
+            _enemy_types_cache['watched'] = start_enemy_types_watcher()
+        
+        data = _enemy_types_cache['data']
+        if data is None or not (_enemy_types_cache['watched'] or _enemy_types_cache['dirty']):
+            try:
+                mtime = ENEMY_CONFIG_FILE.stat().st_mtime_ns
+            except FileNotFoundError:
+                return {}
+            
+            if data is None or _enemy_types_cache['mtime'] != mtime:
+                data = _enemy_types_cache['data'] = read_json_file(ENEMY_CONFIG_FILE)
+                _enemy_types_cache['mtime'] = mtime
+    
+    return copy.deepcopy(data) if mutable else data
+
+
+def write_file_atomic(path, payload):
+    """
+    Записывает байты в файл одной записью с fdatasync и атомарной подменой
+    
+    Данные пишутся во временный файл рядом с целевым и переименовываются поверх
+    него, так что при сбое на диске остаётся либо старая, либо новая версия.
+    """
+    tmp_path = path.with_name(f'.{path.name}.{threading.get_ident()}.tmp')
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(tmp_path, flags, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+        # fdatasync есть не везде (например, в Windows) - там обходимся fsync
+        getattr(os, 'fdatasync', os.fsync)(fd)
+    except BaseException:
+        os.close(fd)
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.close(fd)
+    os.replace(tmp_path, path)
 
 
 def save_enemy_types(data):
     """Сохраняет конфигурацию типов врагов"""
-    with open(ENEMY_CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    payload = dump_json_bytes(data)
+    with _enemy_types_lock:
+        write_file_atomic(ENEMY_CONFIG_FILE, payload)
+        
+        # Записанный словарь сразу становится кэшем - перечитывать файл не нужно
+        # (если с тех пор появились новые изменения, они остаются в памяти до flush)
+        if _enemy_types_cache['data'] is data or not _enemy_types_cache['dirty']:
+            _enemy_types_cache['data'] = data
+            _enemy_types_cache['dirty'] = False
+        _enemy_types_cache['mtime'] = ENEMY_CONFIG_FILE.stat().st_mtime_ns
+
+
+def schedule_save_enemy_types(data):
+    """
+    Делает data текущей конфигурацией и откладывает запись на диск
+    
+    Изменения сразу видны через load_enemy_types, а файл перезаписывается
+    один раз через SAVE_DEBOUNCE_SECONDS - серия правок даёт одну запись.
+    """
+    with _enemy_types_lock:
+        _enemy_types_cache['data'] = data
+        _enemy_types_cache['dirty'] = True
+        if _enemy_types_cache['flush_timer'] is None:
+            timer = threading.Timer(SAVE_DEBOUNCE_SECONDS, flush_enemy_types)
+            timer.daemon = True
+            _enemy_types_cache['flush_timer'] = timer
+            timer.start()
+
+
+def flush_enemy_types():
+    """Записывает на диск отложенные изменения типов врагов (если они есть)"""
+    with _enemy_types_lock:
+        _enemy_types_cache['flush_timer'] = None
+        if not _enemy_types_cache['dirty']:
+            return
+        data = _enemy_types_cache['data']
+    
+    save_enemy_types(data)
+
+
+# Отложенную запись завершаем и при остановке сервера
+atexit.register(flush_enemy_types)
+
+
+def serialized_enemy_types_edit(view):
+    """Декоратор: выполняет изменение типов врагов под общей блокировкой"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with _enemy_types_edit_lock:
+            return view(*args, **kwargs)
+    return wrapper
+
+
+def save_upload(file, filepath, head=b''):
+    """
+    Записывает загруженный файл на диск блоками фиксированного размера
+    
+    Загрузка копируется из потока запроса по UPLOAD_CHUNK_SIZE байт во временный
+    файл рядом с целевым, который затем атомарно переименовывается: недописанный
+    PNG никогда не попадает в списки спрайтов/текстур.
+    
+    Args:
+        file: Загруженный файл (FileStorage)
+        filepath: Путь назначения
+        head: Уже прочитанное из потока начало файла (пишется первым)
+    """
+    # Своё имя на каждый поток - параллельные загрузки одного файла не мешают друг другу
+    tmp_path = filepath.with_name(f'.{filepath.name}.{threading.get_ident()}.part')
+    try:
+        with open(tmp_path, 'wb') as dst:
+            dst.write(head)
+            shutil.copyfileobj(file.stream, dst, UPLOAD_CHUNK_SIZE)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def list_png_files(directory):
+    """
+    Возвращает отсортированный список PNG-файлов директории
+    
+    Результат кэшируется по времени модификации директории (оно меняется при
+    добавлении, удалении и переименовании файлов), так что повторный вызов -
+    это один stat вместо обхода директории.
+    """
+    try:
+        mtime = directory.stat().st_mtime_ns
+    except FileNotFoundError:
+        return []
+    
+    cached = _png_list_cache.get(directory)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
+    with os.scandir(directory) as entries:
+        files = sorted(entry.name for entry in entries
+                       if entry.name.endswith('.png') and entry.is_file())
+    _png_list_cache[directory] = (mtime, files)
+    return files
 
 
 def get_available_sprites():
     """Возвращает список доступных спрайтов врагов"""
-    sprites = []
-    if ENEMY_SPRITES_DIR.exists():
-        for file in ENEMY_SPRITES_DIR.glob('*.png'):
-            sprites.append(file.name)
-    return sorted(sprites)
+    return list_png_files(ENEMY_SPRITES_DIR)
 
 
 def get_available_weapons():
     """Возвращает список доступных спрайтов оружия"""
-    weapons = []
-    if WEAPON_SPRITES_DIR.exists():
-        for file in WEAPON_SPRITES_DIR.glob('*.png'):
-            weapons.append(file.name)
-    return sorted(weapons)
+    return list_png_files(WEAPON_SPRITES_DIR)
 
 
 def get_available_textures():
     """Возвращает список доступных текстур для уровней"""
-    textures = []
-    if TEXTURES_DIR.exists():
-        for file in TEXTURES_DIR.glob('*.png'):
-            textures.append(file.name)
-    return sorted(textures)
+    return list_png_files(TEXTURES_DIR)
+
+
+def send_image(directory, filename):
+    """
+    Отдаёт файл изображения из директории проекта
+    
+    Если задан X_ACCEL_PREFIX, возвращает пустой ответ с X-Accel-Redirect и файл
+    отправляет nginx; иначе send_from_directory (с USE_X_SENDFILE Flask сам
+    ставит заголовок X-Sendfile вместо чтения файла).
+    
+    Ответ получает сильный ETag из mtime и размера файла: повторные запросы
+    браузера возвращают 304 без передачи файла. Имена файлов при загрузке
+    перезаписываются, поэтому ответ не кэшируется надолго, а только ревалидируется.
+    """
+    path = safe_join(str(directory), filename)
+    if path is None:
+        abort(404)
+    
+    # Один stat и на проверку существования, и на ETag
+    try:
+        st = os.stat(path)
+    except OSError:
+        abort(404)
+    if not stat.S_ISREG(st.st_mode):
+        abort(404)
+    
+    accel_prefix = app.config['X_ACCEL_PREFIX']
+    if accel_prefix:
+        relative = Path(path).relative_to(PROJECT_ROOT).as_posix()
+        response = app.response_class(mimetype=mimetypes.guess_type(filename)[0])
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix}/{quote(relative)}"
+        return response
+    
+    response = send_from_directory(
+        str(directory), filename,
+        etag=f"{st.st_mtime_ns:x}-{st.st_size:x}"
+    )
+    response.cache_control.public = True
+    return response
 
 
 @app.route('/')
@@ -110,7 +420,60 @@ def get_enemy_type(enemy_id):
     return jsonify({'error': 'Тип врага не найден'}), 404
 
 
+def keep_value(value):
+    """Оставляет значение поля как есть (без приведения типа)"""
+    return value
+
+
+DEFAULT_ENEMY_COLOR = (200, 50, 50)
+
+# Поля типа врага: (имя, приведение типа, значение по умолчанию)
+# sprite_scale: 1.0 = размер игрока (256px)
+# speed: 6.0 = немного медленнее игрока (8.0)
+ENEMY_FIELD_SPEC = (
+    ('name', keep_value, None),  # По умолчанию - id врага
+    ('sprite_path', keep_value, ''),
+    ('weapon_path', keep_value, ''),
+    ('weapon_offset', keep_value, (0, 0)),  # Смещение оружия [x, y]
+    ('projectile_path', keep_value, ''),
+    ('sprite_scale', float, 1.0),
+    ('max_health', int, 30),
+    ('damage', int, 5),
+    ('speed', float, 6.0),
+    ('attack_type', keep_value, 'melee'),  # 'melee' или 'ranged'
+    ('aggro_range', float, 150),
+    ('attack_range', float, None),  # По умолчанию зависит от attack_type
+    ('attack_cooldown', float, 1.5),
+    ('color', keep_value, DEFAULT_ENEMY_COLOR),
+)
+
+
+def build_enemy_fields(data, existing, enemy_id):
+    """
+    Собирает поля типа врага из данных запроса
+    
+    Args:
+        data: Данные запроса
+        existing: Текущие поля врага (для нового врага - пустой словарь)
+        enemy_id: ID врага (имя по умолчанию)
+    """
+    attack_type = data.get('attack_type', existing.get('attack_type', 'melee'))
+    special_defaults = {
+        'name': enemy_id,
+        'attack_range': 1.2 if attack_type == 'melee' else 8.0
+    }
+    
+    get = data.get
+    existing_get = existing.get
+    special_get = special_defaults.get
+    return {
+        name: coerce(get(name, existing_get(name, special_get(name, default))))
+        for name, coerce, default in ENEMY_FIELD_SPEC
+    }
+
+
 @app.route('/api/enemy-types', methods=['POST'])
+@serialized_enemy_types_edit
 def create_enemy_type():
     """Создать новый тип врага"""
     data = request.json
@@ -120,77 +483,41 @@ def create_enemy_type():
     
     enemy_id = data['id'].lower().replace(' ', '_')
     
-    enemy_types = load_enemy_types()
+    enemy_types = load_enemy_types(mutable=True)
+    enemy_types[enemy_id] = build_enemy_fields(data, {}, enemy_id)
     
-    attack_type = data.get('attack_type', 'melee')
-    
-    # sprite_scale: 1.0 = размер игрока (256px)
-    # speed: 6.0 = немного медленнее игрока (8.0)
-    weapon_offset = data.get('weapon_offset', [0, 0])
-    
-    enemy_types[enemy_id] = {
-        'name': data.get('name', enemy_id),
-        'sprite_path': data.get('sprite_path', ''),
-        'weapon_path': data.get('weapon_path', ''),
-        'weapon_offset': weapon_offset,  # Смещение оружия [x, y]
-        'projectile_path': data.get('projectile_path', ''),
-        'sprite_scale': float(data.get('sprite_scale', 1.0)),
-        'max_health': int(data.get('max_health', 30)),
-        'damage': int(data.get('damage', 5)),
-        'speed': float(data.get('speed', 6.0)),  # Немного медленнее игрока
-        'attack_type': attack_type,  # 'melee' или 'ranged'
-        'aggro_range': float(data.get('aggro_range', 150)),
-        'attack_range': float(data.get('attack_range', 1.2 if attack_type == 'melee' else 8.0)),
-        'attack_cooldown': float(data.get('attack_cooldown', 1.5)),
-        'color': data.get('color', [200, 50, 50]),
-    }
-    
-    save_enemy_types(enemy_types)
+    schedule_save_enemy_types(enemy_types)
     return jsonify({'success': True, 'id': enemy_id})
 
 
 @app.route('/api/enemy-types/<enemy_id>', methods=['PUT'])
+@serialized_enemy_types_edit
 def update_enemy_type(enemy_id):
     """Обновить тип врага"""
     data = request.json
-    enemy_types = load_enemy_types()
+    enemy_types = load_enemy_types(mutable=True)
     
     if enemy_id not in enemy_types:
         return jsonify({'error': 'Тип врага не найден'}), 404
     
-    attack_type = data.get('attack_type', enemy_types[enemy_id].get('attack_type', 'melee'))
-    
-    enemy_types[enemy_id].update({
-        'name': data.get('name', enemy_types[enemy_id].get('name', enemy_id)),
-        'sprite_path': data.get('sprite_path', enemy_types[enemy_id].get('sprite_path', '')),
-        'weapon_path': data.get('weapon_path', enemy_types[enemy_id].get('weapon_path', '')),
-        'weapon_offset': data.get('weapon_offset', enemy_types[enemy_id].get('weapon_offset', [0, 0])),
-        'projectile_path': data.get('projectile_path', enemy_types[enemy_id].get('projectile_path', '')),
-        'sprite_scale': float(data.get('sprite_scale', enemy_types[enemy_id].get('sprite_scale', 1.0))),
-        'max_health': int(data.get('max_health', enemy_types[enemy_id].get('max_health', 30))),
-        'damage': int(data.get('damage', enemy_types[enemy_id].get('damage', 5))),
-        'speed': float(data.get('speed', enemy_types[enemy_id].get('speed', 6.0))),
-        'attack_type': attack_type,
-        'aggro_range': float(data.get('aggro_range', enemy_types[enemy_id].get('aggro_range', 150))),
-        'attack_range': float(data.get('attack_range', enemy_types[enemy_id].get('attack_range', 1.2 if attack_type == 'melee' else 8.0))),
-        'attack_cooldown': float(data.get('attack_cooldown', enemy_types[enemy_id].get('attack_cooldown', 1.5))),
-        'color': data.get('color', enemy_types[enemy_id].get('color', [200, 50, 50])),
-    })
+    existing = enemy_types[enemy_id]
+    existing.update(build_enemy_fields(data, existing, enemy_id))
     
-    save_enemy_types(enemy_types)
+    schedule_save_enemy_types(enemy_types)
     return jsonify({'success': True})
 
 
 @app.route('/api/enemy-types/<enemy_id>', methods=['DELETE'])
+@serialized_enemy_types_edit
 def delete_enemy_type(enemy_id):
     """Удалить тип врага"""
-    enemy_types = load_enemy_types()
+    enemy_types = load_enemy_types(mutable=True)
     
     if enemy_id not in enemy_types:
         return jsonify({'error': 'Тип врага не найден'}), 404
     
     del enemy_types[enemy_id]
-    save_enemy_types(enemy_types)
+    schedule_save_enemy_types(enemy_types)
     return jsonify({'success': True})
 
 
@@ -208,10 +535,15 @@ def upload_sprite():
     if not allowed_file(file.filename):
         return jsonify({'error': 'Разрешены только PNG файлы'}), 400
     
-    filename = secure_filename(file.filename)
+    # Проверяем сигнатуру PNG до записи на диск - не-PNG отклоняем сразу
+    head = file.stream.read(len(PNG_SIGNATURE))
+    if head != PNG_SIGNATURE:
+        return jsonify({'error': 'Файл не является PNG изображением'}), 400
+    
+    filename = cached_secure_filename(file.filename)
     filepath = ENEMY_SPRITES_DIR / filename
     
-    file.save(str(filepath))
+    save_upload(file, filepath, head)
     
     return jsonify({
         'success': True, 
@@ -223,7 +555,7 @@ def upload_sprite():
 @app.route('/api/sprites/<filename>')
 def get_sprite(filename):
     """Получить спрайт для предпросмотра"""
-    return send_from_directory(str(ENEMY_SPRITES_DIR), filename)
+    return send_image(ENEMY_SPRITES_DIR, filename)
 
 
 @app.route('/api/player-sprite')
@@ -231,32 +563,57 @@ def get_player_sprite():
     """Получить спрайт игрока для сравнения"""
     player_sprite_path = PROJECT_ROOT / 'game' / 'images' / 'character' / 'male_unarmored.png'
     
-    if player_sprite_path.exists():
-        return send_from_directory(
-            str(player_sprite_path.parent), 
-            player_sprite_path.name
-        )
-    
-    # Возвращаем 404 если спрайт игрока не найден
-    return jsonify({'error': 'Спрайт игрока не найден'}), 404
+    try:
+        return send_image(player_sprite_path.parent, player_sprite_path.name)
+    except NotFound:
+        # Возвращаем 404 если спрайт игрока не найден
+        return jsonify({'error': 'Спрайт игрока не найден'}), 404
 
 
 @app.route('/api/weapons/<filename>')
 def get_weapon_sprite(filename):
     """Получить спрайт оружия для предпросмотра"""
-    return send_from_directory(str(WEAPON_SPRITES_DIR), filename)
+    return send_image(WEAPON_SPRITES_DIR, filename)
 
 
 @app.route('/api/delete-sprite/<filename>', methods=['DELETE'])
 def delete_sprite(filename):
     """Удалить спрайт"""
-    filepath = ENEMY_SPRITES_DIR / secure_filename(filename)
+    filepath = ENEMY_SPRITES_DIR / cached_secure_filename(filename)
     
-    if filepath.exists():
+    try:
         filepath.unlink()
-        return jsonify({'success': True})
+    except FileNotFoundError:
+        return jsonify({'error': 'Файл не найден'}), 404
     
-    return jsonify({'error': 'Файл не найден'}), 404
+    return jsonify({'success': True})
+
+
+# Шаблоны экспорта кода типов врагов (одна подстановка на врага вместо построчной сборки)
+EXPORT_CODE_HEADER = (
+    "# Автогенерированный код типов врагов\n"
+    "# Скопируйте в BUILTIN_ENEMY_TYPES в game/enemy.py\n"
+    "# Или используйте через enemy_types.json (рекомендуется)\n"
+    "\n"
+    "ENEMY_TYPES = {\n"
+)
+EXPORT_CODE_ENTRY = (
+    "    '{id}': {{\n"
+    "        'name': '{name}',\n"
+    "        'sprite_path': '{sprite_path}' or None,\n"
+    "        'weapon_path': '{weapon_path}' or None,\n"
+    "        'projectile_path': '{projectile_path}' or None,\n"
+    "        'sprite_scale': {sprite_scale},\n"
+    "        'max_health': {max_health},\n"
+    "        'damage': {damage},\n"
+    "        'speed': {speed},\n"
+    "        'attack_type': '{attack_type}',\n"
+    "        'aggro_range': {aggro_range},\n"
+    "        'attack_range': {attack_range},\n"
+    "        'attack_cooldown_time': {attack_cooldown},\n"
+    "        'color': {color},\n"
+    "    }},\n"
+)
 
 
 @app.route('/api/export-code')
@@ -264,33 +621,35 @@ def export_code():
     """Экспортировать код для enemy.py"""
     enemy_types = load_enemy_types()
     
-    code_lines = ["# Автогенерированный код типов врагов", 
-                  "# Скопируйте в BUILTIN_ENEMY_TYPES в game/enemy.py", 
-                  "# Или используйте через enemy_types.json (рекомендуется)",
-                  "",
-                  "ENEMY_TYPES = {"]
-    
+    parts = [EXPORT_CODE_HEADER]
     for enemy_id, params in enemy_types.items():
-        attack_type = params.get('attack_type', 'melee')
-        code_lines.append(f"    '{enemy_id}': {{")
-        code_lines.append(f"        'name': '{params.get('name', enemy_id)}',")
-        code_lines.append(f"        'sprite_path': '{params.get('sprite_path', '')}' or None,")
-        code_lines.append(f"        'weapon_path': '{params.get('weapon_path', '')}' or None,")
-        code_lines.append(f"        'projectile_path': '{params.get('projectile_path', '')}' or None,")
-        code_lines.append(f"        'sprite_scale': {params.get('sprite_scale', 1.0)},")
-        code_lines.append(f"        'max_health': {params.get('max_health', 30)},")
-        code_lines.append(f"        'damage': {params.get('damage', 5)},")
-        code_lines.append(f"        'speed': {params.get('speed', 6.0)},")
-        code_lines.append(f"        'attack_type': '{attack_type}',")
-        code_lines.append(f"        'aggro_range': {params.get('aggro_range', 150)},")
-        code_lines.append(f"        'attack_range': {params.get('attack_range', 1.2)},")
-        code_lines.append(f"        'attack_cooldown_time': {params.get('attack_cooldown', 1.5)},")
-        code_lines.append(f"        'color': {tuple(params.get('color', [200, 50, 50]))},")
-        code_lines.append("    },")
-    
-    code_lines.append("}")
-    
-    return jsonify({'code': '\n'.join(code_lines)})
+        get = params.get
+        parts.append(EXPORT_CODE_ENTRY.format(
+            id=enemy_id,
+            name=get('name', enemy_id),
+            sprite_path=get('sprite_path', ''),
+            weapon_path=get('weapon_path', ''),
+            projectile_path=get('projectile_path', ''),
+            sprite_scale=get('sprite_scale', 1.0),
+            max_health=get('max_health', 30),
+            damage=get('damage', 5),
+            speed=get('speed', 6.0),
+            attack_type=get('attack_type', 'melee'),
+            aggro_range=get('aggro_range', 150),
+            attack_range=get('attack_range', 1.2),
+            attack_cooldown=get('attack_cooldown', 1.5),
+            color=repr(tuple(get('color', DEFAULT_ENEMY_COLOR)))
+        ))
+    parts.append("}")
+    code = ''.join(parts)
+    
+    # Ответ {"code": ...} собираем сами: экранируется только строка кода,
+    # без промежуточного словаря и общего прохода сериализатора jsonify
+    if orjson is not None:
+        escaped = orjson.dumps(code)
+    else:
+        escaped = json.dumps(code, ensure_ascii=False).encode('utf-8')
+    return app.response_class(b'{"code":' + escaped + b'}', mimetype='application/json')
 
 
 # ========================================
@@ -307,7 +666,7 @@ def get_textures():
 @app.route('/api/textures/<filename>')
 def get_texture(filename):
     """Получить текстуру для предпросмотра"""
-    return send_from_directory(str(TEXTURES_DIR), filename)
+    return send_image(TEXTURES_DIR, filename)
 
 
 @app.route('/api/textures', methods=['POST'])
@@ -324,10 +683,15 @@ def upload_texture():
     if not allowed_file(file.filename):
         return jsonify({'error': 'Разрешены только PNG файлы'}), 400
     
-    filename = secure_filename(file.filename)
+    # Проверяем сигнатуру PNG до записи на диск - не-PNG отклоняем сразу
+    head = file.stream.read(len(PNG_SIGNATURE))
+    if head != PNG_SIGNATURE:
+        return jsonify({'error': 'Файл не является PNG изображением'}), 400
+    
+    filename = cached_secure_filename(file.filename)
     filepath = TEXTURES_DIR / filename
     
-    file.save(str(filepath))
+    save_upload(file, filepath, head)
     
     return jsonify({
         'success': True, 
@@ -339,13 +703,14 @@ def upload_texture():
 @app.route('/api/textures/<filename>', methods=['DELETE'])
 def delete_texture(filename):
     """Удалить текстуру"""
-    filepath = TEXTURES_DIR / secure_filename(filename)
+    filepath = TEXTURES_DIR / cached_secure_filename(filename)
     
-    if filepath.exists():
+    try:
         filepath.unlink()
-        return jsonify({'success': True})
+    except FileNotFoundError:
+        return jsonify({'error': 'Файл не найден'}), 404
     
-    return jsonify({'error': 'Файл не найден'}), 404
+    return jsonify({'success': True})
 
 
 # ========================================
@@ -355,10 +720,12 @@ def delete_texture(filename):
 @app.route('/api/levels', methods=['GET'])
 def get_levels():
     """Получить список уровней"""
-    levels = []
-    if LEVELS_DIR.exists():
-        for file in LEVELS_DIR.glob('*.json'):
-            levels.append(file.stem)
+    try:
+        with os.scandir(LEVELS_DIR) as entries:
+            levels = [entry.name[:-5] for entry in entries
+                      if entry.name.endswith('.json') and entry.is_file()]
+    except FileNotFoundError:
+        levels = []
     return jsonify({'levels': sorted(levels)})
 
 
@@ -367,11 +734,10 @@ def get_level(level_name):
     """Получить данные уровня"""
     level_file = LEVELS_DIR / f"{level_name}.json"
     
-    if level_file.exists():
-        with open(level_file, 'r', encoding='utf-8') as f:
-            return jsonify(json.load(f))
-    
-    return jsonify({'error': 'Уровень не найден'}), 404
+    try:
+        return jsonify(read_json_file(level_file))
+    except FileNotFoundError:
+        return jsonify({'error': 'Уровень не найден'}), 404
 
 
 if __name__ == '__main__':
@@ -382,5 +748,6 @@ if __name__ == '__main__':
     print(f"📄 Конфиг: {ENEMY_CONFIG_FILE}")
     print(f"🌐 Откройте в браузере: http://localhost:5000")
     print("=" * 50)
-    app.run(debug=True, port=5000)
+    # Отладчик и автоперезагрузка Werkzeug - только по DIABRO_EDITOR_DEBUG=1
+    app.run(debug=os.environ.get('DIABRO_EDITOR_DEBUG') == '1', port=5000)
 
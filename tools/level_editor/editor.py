@@ -3,14 +3,27 @@ DiaBRO Level Editor - Изометрический редактор уровне
 """
 
 import pygame
+import bisect
 import json
+import math
+import mmap
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# orjson (Rust) сохраняет и читает уровень в разы быстрее стандартного json; если не установлен - работаем на json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Добавляем корневую папку проекта в путь
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+# Формат тайлов в файле уровня - общий с игрой
+from game.level import pack_level_tiles, unpack_level_tiles
+
 # Константы
 TILE_WIDTH = 128
 TILE_HEIGHT = 64
@@ -21,6 +34,9 @@ SCREEN_HEIGHT = 1080
 GRID_WIDTH = 20
 GRID_HEIGHT = 20
 
+# Запас вокруг контура подсветки на его поверхности (линия толщиной 2 выходит за вершины)
+HOVER_OUTLINE_MARGIN = 2
+
 # Цвета
 COLOR_BG = (30, 35, 45)
 COLOR_GRID = (60, 70, 90)
@@ -32,46 +48,93 @@ COLOR_BUTTON = (70, 80, 100)
 COLOR_BUTTON_HOVER = (90, 100, 130)
 COLOR_ACCENT = (88, 166, 255)
 
+# Кэш отрендеренного текста {(font, text, color): surface}, старые записи вытесняются первыми
+TEXT_CACHE_SIZE = 256
+_text_cache = {}
+
+
+def render_text(font, text, color):
+    """Рендерит текст со сглаживанием (повторные вызовы с тем же текстом берутся из кэша)"""
+    key = (font, text, color)
+    surface = _text_cache.get(key)
+    if surface is None:
+        if len(_text_cache) >= TEXT_CACHE_SIZE:
+            del _text_cache[next(iter(_text_cache))]
+        surface = _text_cache[key] = font.render(text, True, color)
+    return surface
+
 
 class TileSheet:
     """Класс для работы со спрайтшитом тайлов"""
     
-    def __init__(self, path, tile_width=TILE_WIDTH, tile_height=TILE_HEIGHT):
+    def __init__(self, path, tile_width=TILE_WIDTH, tile_height=TILE_HEIGHT, image=None):
+        """
+        Args:
+            path: Путь к PNG спрайтшита
+            image: Уже декодированный спрайтшит (например, загруженный в потоке); None - загрузить из path
+        """
         self.path = path
         self.name = Path(path).stem
+        self.first_tile_id = 0  # Номер первого тайла в общей нумерации тайлов всех тайлсетов редактора
         self.tile_width = tile_width
         self.tile_height = tile_height
-        self.image = pygame.image.load(path).convert_alpha()
+        if image is None:
+            image = pygame.image.load(path)
+        self.image = image.convert_alpha()
         self.sheet_width = self.image.get_width()
         self.sheet_height = self.image.get_height()
         
+        # Полностью непрозрачные спрайтшиты конвертируем без альфа-канала:
+        # SDL рисует такие тайлы более быстрым блиттером без попиксельной альфы
+        opaque_pixels = pygame.mask.from_surface(self.image, 254).count()
+        self.has_alpha = opaque_pixels < self.sheet_width * self.sheet_height
+        
         # Вычисляем количество тайлов
         self.cols = self.sheet_width // tile_width
         self.rows = self.sheet_height // tile_height
         self.tile_count = self.cols * self.rows
         
-        # Кэш тайлов
-        self.tiles = []
-        self._extract_tiles()
-    
-    def _extract_tiles(self):
-        """Извлекает все тайлы из спрайтшита"""
-        for row in range(self.rows):
-            for col in range(self.cols):
-                rect = pygame.Rect(
-                    col * self.tile_width,
-                    row * self.tile_height,
-                    self.tile_width,
-                    self.tile_height
-                )
-                tile = self.image.subsurface(rect).copy()
-                self.tiles.append(tile)
+        # Кэш тайлов: вырезаются из спрайтшита при первом обращении (см. get_tile),
+        # так тайлсеты, которые не выбирали и не используют в уровне, не занимают память
+        self.tiles = [None] * self.tile_count
+        
+        # Уменьшенные копии тайлов для панели: {(ширина, высота): [surface]}
+        self._preview_tiles = {}
+    
+    def _extract_tile(self, index):
+        """Вырезает тайл с заданным индексом из спрайтшита"""
+        row, col = divmod(index, self.cols)
+        rect = pygame.Rect(
+            col * self.tile_width,
+            row * self.tile_height,
+            self.tile_width,
+            self.tile_height
+        )
+        # Тайл в формате дисплея, blit идёт по быстрому пути SDL
+        tile = self.image.subsurface(rect).copy()
+        return tile.convert_alpha() if self.has_alpha else tile.convert()
     
     def get_tile(self, index):
-        """Возвращает тайл по индексу"""
-        if 0 <= index < len(self.tiles):
-            return self.tiles[index]
+        """Возвращает тайл по индексу (вырезается при первом обращении)"""
+        if 0 <= index < self.tile_count:
+            tile = self.tiles[index]
+            if tile is None:
+                tile = self.tiles[index] = self._extract_tile(index)
+            return tile
         return None
+    
+    def get_preview_tiles(self, width, height):
+        """Возвращает все тайлы, масштабированные до (width, height) (масштабируются один раз)"""
+        previews = self._preview_tiles.get((width, height))
+        if previews is None:
+            # Масштабирование разовое, поэтому берём сглаживающее: при уменьшении
+            # тайла в несколько раз простое scale даёт заметную "лесенку"
+            previews = [
+                pygame.transform.smoothscale(self.get_tile(index), (width, height)).convert_alpha()
+                for index in range(self.tile_count)
+            ]
+            self._preview_tiles[(width, height)] = previews
+        return previews
 
 
 class LevelEditor:
@@ -95,42 +158,80 @@ class LevelEditor:
         self.clock = pygame.time.Clock()
         self.running = True
         
+        # Кадр перерисовывается только после изменений (события ввода, правки уровня);
+        # если сдвинулась только подсветка, перерисовываются лишь её старая и новая области
+        self._dirty = True
+        self._dirty_rects = []
+        self._panel_dirty = False  # Изменилась только панель (клик/колесо над панелью)
+        
+        # Запись уровней на диск идёт в отдельном потоке, чтобы Ctrl+S не подвешивал кадр;
+        # один поток - сохранения выполняются строго по очереди
+        self._io_executor = ThreadPoolExecutor(max_workers=1)
+        self._level_list_stale = False  # Выставляется потоком записи, список обновляется в _update
+        self._pending_level_load = None  # Future чтения уровня в потоке, результат применяется в _update
+        
+        # Пакетная отрисовка: fblits есть только в pygame-ce (не строит список rect)
+        self._fblits = getattr(self.screen, 'fblits', None)
+        
         # Шрифты
         self.font = pygame.font.Font(None, 24)
         self.font_small = pygame.font.Font(None, 18)
         self.font_large = pygame.font.Font(None, 32)
+        self._help_text_cache = [None, None, None]  # Отрендеренные строки подсказки: (text, surface)
         
         # Загрузка тайлсетов
         self.tilesets = []
         self.tilesets_dict = {}  # Словарь для быстрого доступа по имени
+        self.tile_id_count = 0  # Всего тайлов во всех тайлсетах (см. TileSheet.first_tile_id)
         self.current_tileset_index = 0
         self.current_tile_index = 0
         self._load_tilesets()
         
         # Данные уровня
         self.level_data = {}  # {(x, y): {'tileset': name, 'tile': index}}
+        self._tile_values = {}  # Общие (неизменяемые по соглашению) значения level_data: {(name, index): dict}
         self.level_name = "new_level"
-        self._sorted_tiles_cache = None  # Кэш отсортированных тайлов
+        self._sorted_tiles_cache = None  # Кэш отсортированных тайлов (см. _build_sorted_tiles)
+        self._draw_order = []  # Ключи глубины (x + y, x) для записей _sorted_tiles_cache, по возрастанию
         self._level_data_dirty = True  # Флаг изменения данных уровня
+        self._level_blits_cache = None  # Готовый список (surface, pos) для blits при неизменных камере и zoom
+        self._level_blits_key = None
         
         # Камера
         self.camera_x = SCREEN_WIDTH // 2 - 200
         self.camera_y = 100
         self.camera_zoom = 1.0  # Масштаб камеры
         self._cached_zoom = 1.0  # Кэшированный zoom для проверки изменений
-        self._scaled_tiles_cache = {}  # Кэш масштабированных тайлов {(tileset_name, tile_index, zoom): surface}
+        self._scaled_tiles_cache = [None] * self.tile_id_count  # Масштабированные тайлы текущего zoom по номеру тайла
+        self._scaled_tiles_by_zoom = {self.camera_zoom: self._scaled_tiles_cache}  # Кэши всех посещённых ступеней zoom
+        self._outline_cache = {}  # Контуры ромба подсветки {(zoom, color, дробная часть x, y): surface}
+        self._ghost_cache = {}  # Полупрозрачные превью тайлов под курсором {(tileset_name, tile_index, zoom): surface}
+        self._iso_table = self._build_iso_table(self.camera_zoom)  # Смещения клеток сетки при текущем zoom
+        self._diamond_template = self._build_diamond_template(self.camera_zoom)  # Вершины ромба клетки от её угла
+        self._inv_tile_size = self._build_inv_tile_size(self.camera_zoom)  # Обратные размеры клетки для screen_to_iso
         self.dragging = False
         self.drag_start = (0, 0)
         self.camera_start = (0, 0)
         
+        # Сетка, нарисованная заранее: ключ (zoom, дробная часть камеры x, y)
+        self._grid_cache = None
+        self._grid_cache_key = None
+        self._grid_cache_offset = (0, 0)
+        
+        # Карта (фон, уровень, сетка) последнего полного кадра без подсветки и подсказок -
+        # из неё восстанавливаются области при смене подсветки (см. _draw_regions)
+        self._map_layer = None
+        
         # Hover
         self.hover_tile = None
         
         # UI
         self.panel_width = 300
+        self._panel_background = None  # Неизменная часть панели (см. _build_panel_background)
         self.tile_selector_scroll = 0
         self.level_list_scroll = 0
         self.available_levels = []
+        self._levels_dir_mtime = None  # mtime папки уровней при последнем чтении списка
         self._refresh_level_list()
         
         # Режимы
@@ -149,9 +250,18 @@ class LevelEditor:
         textures_path = Path(__file__).parent.parent.parent / "game" / "images" / "textures"
         
         if textures_path.exists():
-            for file in sorted(textures_path.glob("*.png")):
+            files = sorted(textures_path.glob("*.png"))
+            
+            # PNG декодируются параллельно (pygame отпускает GIL на время декодирования),
+            # convert_alpha и всё остальное - в главном потоке, где создан дисплей
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                decoded = [executor.submit(pygame.image.load, str(file)) for file in files]
+            
+            for file, image in zip(files, decoded):
                 try:
-                    tileset = TileSheet(str(file))
+                    tileset = TileSheet(str(file), image=image.result())
+                    tileset.first_tile_id = self.tile_id_count
+                    self.tile_id_count += tileset.tile_count
                     self.tilesets.append(tileset)
                     self.tilesets_dict[tileset.name] = tileset  # Добавляем в словарь
                     print(f"Loaded: {file.name} ({tileset.tile_count} tiles)")
@@ -162,27 +272,55 @@ class LevelEditor:
             print("Warning: No tilesets found in game/images/textures/")
     
     def _refresh_level_list(self):
-        """Обновляет список доступных уровней"""
+        """Обновляет список доступных уровней (папка перечитывается, только если изменилась)"""
         levels_path = Path(__file__).parent.parent.parent / "game" / "levels"
-        if levels_path.exists():
-            self.available_levels = sorted([f.stem for f in levels_path.glob("*.json")])
-        else:
+        try:
+            # Создание, удаление и переименование файлов меняют mtime папки
+            mtime = os.stat(levels_path).st_mtime_ns
+        except OSError:
             self.available_levels = []
+            self._levels_dir_mtime = None
+            return
+        
+        if mtime == self._levels_dir_mtime:
+            return
+        self._levels_dir_mtime = mtime
+        with os.scandir(levels_path) as entries:
+            self.available_levels = sorted(entry.name[:-5] for entry in entries if entry.name.endswith('.json'))
     
     def screen_to_iso(self, screen_x, screen_y):
         """Конвертирует экранные координаты в изометрические (сетка)"""
-        # Учитываем камеру и zoom
-        x = (screen_x - self.camera_x) / self.camera_zoom
-        y = (screen_y - self.camera_y) / self.camera_zoom
-        
-        # Изометрическое преобразование
-        tile_x = (x / (TILE_WIDTH / 2) + y / (TILE_HEIGHT / 2)) / 2
-        tile_y = (y / (TILE_HEIGHT / 2) - x / (TILE_WIDTH / 2)) / 2
-        
-        return int(tile_x), int(tile_y)
+        # Быстрый путь без делений для zoom 1.0 (вызывается на каждое движение мыши):
+        # при TILE_HEIGHT = TILE_WIDTH / 2 формулы ниже сводятся к
+        # tile_x = (x + 2y) / TILE_WIDTH, tile_y = (2y - x) / TILE_WIDTH
+        if self.camera_zoom == 1.0 and TILE_WIDTH == 2 * TILE_HEIGHT:
+            x = screen_x - self.camera_x
+            y = screen_y - self.camera_y
+            sum_xy = x + 2 * y
+            diff_xy = 2 * y - x
+            # Отбрасываем дробную часть к нулю, как int() в общем случае
+            tile_x = sum_xy // TILE_WIDTH if sum_xy >= 0 else -(-sum_xy // TILE_WIDTH)
+            tile_y = diff_xy // TILE_WIDTH if diff_xy >= 0 else -(-diff_xy // TILE_WIDTH)
+            return int(tile_x), int(tile_y)
+        
+        # Изометрическое преобразование с учётом камеры и zoom: вместо делений -
+        # умножения на 1 / (TILE_WIDTH * zoom) и 1 / (TILE_HEIGHT * zoom), заранее
+        # посчитанные для текущего zoom
+        self._sync_zoom_caches()
+        inv_width, inv_height = self._inv_tile_size
+        x = (screen_x - self.camera_x) * inv_width
+        y = (screen_y - self.camera_y) * inv_height
+        
+        return int(x + y), int(y - x)
     
     def iso_to_screen(self, tile_x, tile_y):
         """Конвертирует изометрические координаты в экранные"""
+        # Клетки сетки берём из таблицы для текущего zoom - остаётся только сдвиг камеры
+        if 0 <= tile_x < GRID_WIDTH and 0 <= tile_y < GRID_HEIGHT:
+            self._sync_zoom_caches()
+            offset_x, offset_y = self._iso_table[tile_x][tile_y]
+            return offset_x + self.camera_x, offset_y + self.camera_y
+        
         screen_x = (tile_x - tile_y) * (TILE_WIDTH // 2) * self.camera_zoom + self.camera_x
         screen_y = (tile_x + tile_y) * (TILE_HEIGHT // 2) * self.camera_zoom + self.camera_y
         return screen_x, screen_y
@@ -192,15 +330,40 @@ class LevelEditor:
         while self.running:
             self._handle_events()
             self._update()
-            self._draw()
-            pygame.display.flip()
+            if self._dirty:
+                self._draw()
+                pygame.display.flip()
+                self._dirty = False
+                self._dirty_rects.clear()
+            else:
+                rects = self._dirty_rects
+                if rects:
+                    self._draw_regions(rects)
+                if self._panel_dirty:
+                    self._draw_panel()
+                    rects.append(self._panel_rect())
+                if rects:
+                    pygame.display.update(rects)
+                    rects.clear()
+            self._panel_dirty = False
             self.clock.tick(60)
         
+        # Дожидаемся незавершённых сохранений
+        self._io_executor.shutdown(wait=True)
         pygame.quit()
     
     def _handle_events(self):
         """Обработка событий"""
         for event in pygame.event.get():
+            # Любое событие, кроме движения мыши, может изменить картинку
+            # (в том числе события окна); движение проверяется в обработчике.
+            # Клик и колесо над панелью без подсветки на карте меняют только панель -
+            # обработчик сам отмечает _dirty, если затронута карта (загрузка уровня и т.п.)
+            if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEWHEEL) and self._is_panel_event(event):
+                self._panel_dirty = True
+            elif event.type != pygame.MOUSEMOTION:
+                self._dirty = True
+            
             if event.type == pygame.QUIT:
                 self.running = False
             
@@ -219,6 +382,17 @@ class LevelEditor:
             elif event.type == pygame.MOUSEWHEEL:
                 self._handle_mousewheel(event)
     
+    def _is_panel_event(self, event):
+        """Проверяет, что событие мыши произошло над панелью и на карте нет подсветки"""
+        if self.hover_tile is not None:
+            return False
+        x = event.pos[0] if event.type == pygame.MOUSEBUTTONDOWN else pygame.mouse.get_pos()[0]
+        return x > SCREEN_WIDTH - self.panel_width
+    
+    def _panel_rect(self):
+        """Экранная область боковой панели"""
+        return pygame.Rect(SCREEN_WIDTH - self.panel_width, 0, self.panel_width, SCREEN_HEIGHT)
+    
     def _handle_keydown(self, event):
         """Обработка нажатий клавиш"""
         if event.key == pygame.K_s and pygame.key.get_mods() & pygame.KMOD_CTRL:
@@ -227,6 +401,10 @@ class LevelEditor:
             self._load_level_dialog()
         elif event.key == pygame.K_g:
             self.show_grid = not self.show_grid
+            if not self.show_grid:
+                # Готовая сетка при сильном zoom занимает десятки мегабайт - не держим её скрытой
+                self._grid_cache = None
+                self._grid_cache_key = None
         elif event.key == pygame.K_e:
             self.eraser_mode = not self.eraser_mode
         elif event.key == pygame.K_ESCAPE:
@@ -271,7 +449,8 @@ class LevelEditor:
     
     def _place_tile_at_hover(self):
         """Ставит тайл(ы) в текущей позиции hover"""
-        if not self.hover_tile:
+        # Во время загрузки уровня правки прежнего уровня были бы потеряны
+        if not self.hover_tile or self._pending_level_load is not None:
             return
         
         if self.eraser_mode:
@@ -291,17 +470,27 @@ class LevelEditor:
                     
                     # Проверяем границы
                     if 0 <= tile_x < GRID_WIDTH and 0 <= tile_y < GRID_HEIGHT:
-                        self.level_data[(tile_x, tile_y)] = {
-                            'tileset': tileset.name,
-                            'tile': self.current_tile_index
-                        }
+                        self.level_data[(tile_x, tile_y)] = self._tile_value(tileset.name, self.current_tile_index)
+                        self._update_draw_order(tile_x, tile_y)
             
-            # Помечаем данные как измененные
-            self._level_data_dirty = True
+            self._dirty = True
+    
+    def _tile_value(self, tileset_name, tile_index):
+        """
+        Возвращает общий словарь {'tileset', 'tile'} для значения клетки
+        
+        Клетки с одинаковым тайлом ссылаются на один словарь вместо отдельного
+        на каждую клетку; значения level_data заменяются целиком и не изменяются.
+        """
+        key = (tileset_name, tile_index)
+        value = self._tile_values.get(key)
+        if value is None:
+            value = self._tile_values[key] = {'tileset': tileset_name, 'tile': tile_index}
+        return value
     
     def _erase_tile_at_hover(self):
         """Удаляет тайл(ы) в текущей позиции hover"""
-        if not self.hover_tile:
+        if not self.hover_tile or self._pending_level_load is not None:
             return
         
         # Вычисляем область стирания (квадрат вокруг центра)
@@ -320,11 +509,11 @@ class LevelEditor:
                     key = (tile_x, tile_y)
                     if key in self.level_data:
                         del self.level_data[key]
+                        self._update_draw_order(tile_x, tile_y)
                         erased = True
         
-        # Помечаем данные как измененные, если что-то было удалено
         if erased:
-            self._level_data_dirty = True
+            self._dirty = True
     
     def _handle_mousemotion(self, event):
         """Обработка движения мыши"""
@@ -335,10 +524,11 @@ class LevelEditor:
             dy = y - self.drag_start[1]
             self.camera_x = self.camera_start[0] + dx
             self.camera_y = self.camera_start[1] + dy
+            self._dirty = True
         
         # Обновляем hover только для области карты
         if x < SCREEN_WIDTH - self.panel_width:
-            self.hover_tile = self.screen_to_iso(x, y)
+            self._set_hover_tile(self.screen_to_iso(x, y))
             
             # Рисуем при зажатой ЛКМ
             if self.mouse_drawing:
@@ -348,7 +538,54 @@ class LevelEditor:
             if self.mouse_erasing:
                 self._erase_tile_at_hover()
         else:
-            self.hover_tile = None
+            self._set_hover_tile(None)
+    
+    def _set_hover_tile(self, hover_tile):
+        """Меняет клетку под курсором и помечает для перерисовки старую и новую области подсветки"""
+        if hover_tile == self.hover_tile:
+            return
+        
+        old_rect = self._hover_area_rect()
+        self.hover_tile = hover_tile
+        new_rect = self._hover_area_rect()
+        for rect in (old_rect, new_rect):
+            if rect is not None:
+                self._dirty_rects.append(rect)
+    
+    def _hover_area_rect(self):
+        """Возвращает экранную область подсветки (контуры и превью) в пределах карты или None"""
+        if not self.hover_tile:
+            return None
+        
+        self._sync_zoom_caches()
+        center_x, center_y = self.hover_tile
+        half_size = self.placement_size // 2
+        tw = int(TILE_WIDTH * self.camera_zoom)
+        th = int(TILE_HEIGHT * self.camera_zoom)
+        margin = HOVER_OUTLINE_MARGIN
+        
+        area = None
+        for dx in range(-half_size, half_size + (1 if self.placement_size % 2 == 1 else 0)):
+            for dy in range(-half_size, half_size + (1 if self.placement_size % 2 == 1 else 0)):
+                tile_x = center_x + dx
+                tile_y = center_y + dy
+                if not (0 <= tile_x < GRID_WIDTH and 0 <= tile_y < GRID_HEIGHT):
+                    continue
+                
+                offset_x, offset_y = self._iso_table[tile_x][tile_y]
+                cell = pygame.Rect(
+                    math.floor(offset_x + self.camera_x) - margin,
+                    math.floor(offset_y + self.camera_y) - margin,
+                    tw + 2 * margin + 2, th + 2 * margin + 2
+                )
+                area = cell if area is None else area.union(cell)
+        
+        if area is None:
+            return None
+        
+        # Под панелью подсветку не видно - эту часть не перерисовываем
+        area = area.clip(pygame.Rect(0, 0, SCREEN_WIDTH - self.panel_width, SCREEN_HEIGHT))
+        return area if area.width and area.height else None
     
     def _handle_mousewheel(self, event):
         """Обработка колеса мыши"""
@@ -359,6 +596,7 @@ class LevelEditor:
         if keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]:
             self.placement_size += event.y
             self.placement_size = max(1, min(10, self.placement_size))  # От 1 до 10
+            self._dirty = True  # Размер области показан в подсказках на карте
             return
         
             # Скролл в панели - прокрутка тайлов или списка уровней
@@ -377,8 +615,9 @@ class LevelEditor:
             # Ctrl + колесо = zoom
             if keys[pygame.K_LCTRL] or keys[pygame.K_RCTRL]:
                 old_zoom = self.camera_zoom
-                self.camera_zoom += event.y * 0.1
-                self.camera_zoom = max(0.25, min(2.0, self.camera_zoom))
+                # Фиксированные ступени (0.25, 0.3 ... 2.0): zoom не накапливает ошибку float
+                # (1.0000000000000002 вместо 1.0) и кэши по zoom переиспользуются
+                self.camera_zoom = max(0.25, min(2.0, round(self.camera_zoom + event.y * 0.1, 1)))
                 
                 # Центрируем zoom на позиции мыши
                 if old_zoom != self.camera_zoom:
@@ -413,6 +652,7 @@ class LevelEditor:
                 self._save_level()
             elif 100 <= panel_x <= 180:
                 self._create_new_level()
+                self._dirty = True
             elif 190 <= panel_x <= 270:
                 self.eraser_mode = not self.eraser_mode
         
@@ -426,10 +666,12 @@ class LevelEditor:
             if 0 <= level_index < len(self.available_levels):
                 level_name = self.available_levels[level_index]
                 self._load_level_by_name(level_name)
+                self._dirty = True
         
         # Кнопка "New Level"
         elif 265 <= y <= 289:
             self._create_new_level()
+            self._dirty = True
         
         # Клик на тайле в сетке
         elif y >= 270:
@@ -449,10 +691,23 @@ class LevelEditor:
     
     def _update(self):
         """Обновление логики"""
-        pass
+        # Фоновое сохранение завершилось - обновляем список уровней в главном потоке
+        if self._level_list_stale:
+            self._level_list_stale = False
+            self._refresh_level_list()
+            self._dirty = True
+        
+        # Уровень прочитан в потоке - подменяем данные в главном потоке, между кадрами
+        pending_load = self._pending_level_load
+        if pending_load is not None and pending_load.done():
+            self._pending_level_load = None
+            self._apply_loaded_level(pending_load)
+            self._dirty = True
     
     def _draw(self):
         """Отрисовка"""
+        # Экран здесь не блокируется (lock): уровень, сетка и подсветка выводятся
+        # только через blits, а blit в заблокированную поверхность pygame не выполняет
         self.screen.fill(COLOR_BG)
         
         # Рисуем уровень
@@ -462,6 +717,9 @@ class LevelEditor:
         if self.show_grid:
             self._draw_grid()
         
+        # Запоминаем карту до подсветки
+        self._save_map_layer()
+        
         # Рисуем hover
         self._draw_hover()
         
@@ -471,87 +729,297 @@ class LevelEditor:
         # Рисуем подсказки
         self._draw_help()
     
+    def _draw_regions(self, rects):
+        """
+        Перерисовывает только заданные области карты (смена подсветки)
+        
+        Панель не затрагивается: области обрезаны по карте в _hover_area_rect.
+        Карта между полными кадрами не меняется (любая её правка помечает кадр
+        целиком), поэтому тайлы и сетка не перерисовываются, а копируются из _map_layer.
+        """
+        for rect in rects:
+            self.screen.set_clip(rect)
+            self.screen.blit(self._map_layer, rect, rect)
+            self._draw_hover()
+            self._draw_help()
+        self.screen.set_clip(None)
+    
+    def _save_map_layer(self):
+        """Копирует карту с экрана (без панели) в _map_layer"""
+        if self._map_layer is None:
+            self._map_layer = pygame.Surface((SCREEN_WIDTH - self.panel_width, SCREEN_HEIGHT)).convert()
+        self._map_layer.blit(self.screen, (0, 0), self._map_layer.get_rect())
+    
     def _draw_level(self):
         """Отрисовка уровня"""
         # Обновляем кэш отсортированных тайлов при изменении данных
         if self._level_data_dirty or self._sorted_tiles_cache is None:
-            self._sorted_tiles_cache = sorted(self.level_data.items(), key=lambda x: (x[0][0] + x[0][1], x[0][0]))
+            self._draw_order, self._sorted_tiles_cache = self._build_sorted_tiles()
             self._level_data_dirty = False
+            self._level_blits_key = None
         
-        # Очищаем кэш масштабированных тайлов при изменении zoom
-        if self.camera_zoom != self._cached_zoom:
-            self._scaled_tiles_cache.clear()
-            self._cached_zoom = self.camera_zoom
+        self._sync_zoom_caches()
+        
+        # Если камера и zoom не менялись (перерисовка из-за hover, панели и т.п.),
+        # координаты и отсечение не пересчитываем
+        blits_key = (self.camera_zoom, self.camera_x, self.camera_y)
+        if self._level_blits_key != blits_key:
+            self._level_blits_cache = self._build_level_blits()
+            self._level_blits_key = blits_key
         
+        self._blit_batch(self._level_blits_cache)
+    
+    def _build_level_blits(self):
+        """Собирает видимые тайлы уровня в список (surface, pos) для одного вызова blits"""
         # Размер тайла с учётом zoom
-        scaled_width = int(TILE_WIDTH * self.camera_zoom)
-        scaled_height = int(TILE_HEIGHT * self.camera_zoom)
+        zoom = self.camera_zoom
+        scaled_width = int(TILE_WIDTH * zoom)
+        scaled_height = int(TILE_HEIGHT * zoom)
+        camera_x = self.camera_x
+        camera_y = self.camera_y
+        
+        # Область, в которой левый верхний угол тайла даёт видимый пиксель:
+        # карта без панели (панель непрозрачна), расширенная на тайл влево и вверх
+        cull_rect = pygame.Rect(
+            -scaled_width, -scaled_height,
+            SCREEN_WIDTH - self.panel_width + scaled_width + 1, SCREEN_HEIGHT + scaled_height + 1
+        )
+        in_view = cull_rect.collidepoint
+        
+        # Записи отсортированы по (x + y, x): экранный y зависит только от глубины x + y,
+        # а экранный x внутри строки глубины - только от x. Поэтому видимые тайлы каждой
+        # строки - непрерывный диапазон индексов, он находится бинарным поиском по _draw_order
+        # (границы с запасом в одну клетку, точная проверка - in_view)
+        order = self._draw_order
+        if not order:
+            return []
+        row_height = (TILE_HEIGHT // 2) * zoom
+        half_width = (TILE_WIDTH // 2) * zoom
+        first_depth = max(math.floor((-scaled_height - camera_y) / row_height) - 1, order[0][0])
+        last_depth = min(math.ceil((SCREEN_HEIGHT - camera_y) / row_height) + 1, order[-1][0])
+        # screen_x = (2 * x - depth) * half_width + camera_x
+        left = (-scaled_width - camera_x) / half_width
+        right = (cull_rect.right - camera_x) / half_width
+        tiles = self._sorted_tiles_cache
+        
+        blit_list = []
+        append = blit_list.append
+        scaled = zoom != 1.0
+        
+        for depth in range(first_depth, last_depth + 1):
+            start = bisect.bisect_left(order, (depth, math.floor((left + depth) / 2) - 1))
+            stop = bisect.bisect_left(order, (depth, math.ceil((right + depth) / 2) + 2))
+            for base_x, base_y, tile_id, tile in tiles[start:stop]:
+                screen_x = base_x * zoom + camera_x
+                screen_y = base_y * zoom + camera_y
+                
+                # Пропускаем тайлы за пределами видимой области (одна проверка в C)
+                if not in_view(screen_x, screen_y):
+                    continue
+                
+                # Используем кэш для масштабированных тайлов
+                if scaled:
+                    tile = self._get_scaled_tile(tile_id, tile, scaled_width, scaled_height)
+                append((tile, (screen_x, screen_y)))
         
-        # Предвычисляем границы экрана для оптимизации
-        screen_left = -scaled_width
-        screen_right = SCREEN_WIDTH
-        screen_top = -scaled_height
-        screen_bottom = SCREEN_HEIGHT
+        return blit_list
+    
+    def _build_sorted_tiles(self):
+        """
+        Строит список тайлов уровня для отрисовки в порядке глубины
+        
+        Тайлсет и поверхность тайла разрешаются здесь один раз (при загрузке
+        уровня), а в кадре остаются только умножение на zoom и проверка экрана.
+        Правки кистью обновляют результат точечно (см. _update_draw_order).
+        
+        Returns:
+            tuple: (order, tiles) - order: [(x + y, x), ...] по возрастанию,
+                   tiles: [(iso_x, iso_y, номер тайла, tile), ...] в том же
+                   порядке, iso_x/iso_y без учёта zoom и камеры
+        """
+        # Раскладываем клетки по корзинам глубины x + y (их не больше GRID_WIDTH + GRID_HEIGHT - 1),
+        # внутри корзины сортируем только по x - без общей сортировки с lambda-ключом
+        buckets = {}
+        for (tx, ty), data in self.level_data.items():
+            bucket = buckets.get(tx + ty)
+            if bucket is None:
+                bucket = buckets[tx + ty] = []
+            bucket.append((tx, ty, data))
+        
+        order = []
+        tiles = []
+        for depth in sorted(buckets):
+            bucket = buckets[depth]
+            bucket.sort()
+            for tx, ty, data in bucket:
+                record = self._make_tile_record(tx, ty, data)
+                if record is not None:
+                    order.append((depth, tx))
+                    tiles.append(record)
+        return order, tiles
+    
+    def _make_tile_record(self, tx, ty, data):
+        """Возвращает запись тайла для _sorted_tiles_cache или None, если тайл не найден"""
+        # Быстрый доступ к тайлсету через словарь
+        tileset = self.tilesets_dict.get(data['tileset'])
+        if not tileset:
+            return None
+        
+        tile = tileset.get_tile(data['tile'])
+        if not tile:
+            return None
+        
+        return (
+            (tx - ty) * (TILE_WIDTH // 2), (tx + ty) * (TILE_HEIGHT // 2),
+            tileset.first_tile_id + data['tile'], tile
+        )
+    
+    def _update_draw_order(self, tx, ty):
+        """
+        Точечно обновляет отсортированный список тайлов после изменения клетки (tx, ty)
         
-        for (tx, ty), data in self._sorted_tiles_cache:
-            screen_x, screen_y = self.iso_to_screen(tx, ty)
-            
-            # Пропускаем тайлы за пределами экрана (оптимизированная проверка)
-            if screen_x < screen_left or screen_x > screen_right:
-                continue
-            if screen_y < screen_top or screen_y > screen_bottom:
-                continue
-            
-            # Быстрый доступ к тайлсету через словарь
-            tileset = self.tilesets_dict.get(data['tileset'])
-            if not tileset:
-                continue
-            
-            tile = tileset.get_tile(data['tile'])
-            if not tile:
-                continue
-            
-            # Используем кэш для масштабированных тайлов
-            if self.camera_zoom != 1.0:
-                cache_key = (data['tileset'], data['tile'], self.camera_zoom)
-                if cache_key not in self._scaled_tiles_cache:
-                    self._scaled_tiles_cache[cache_key] = pygame.transform.scale(
-                        tile, (scaled_width, scaled_height)
-                    )
-                scaled_tile = self._scaled_tiles_cache[cache_key]
-                self.screen.blit(scaled_tile, (screen_x, screen_y))
+        Вместо пересортировки всего уровня - бинарный поиск по ключу (x + y, x)
+        и вставка/замена/удаление одной записи.
+        """
+        if self._level_data_dirty or self._sorted_tiles_cache is None:
+            return  # Список всё равно будет перестроен целиком
+        
+        order = self._draw_order
+        order_key = (tx + ty, tx)
+        index = bisect.bisect_left(order, order_key)
+        present = index < len(order) and order[index] == order_key
+        
+        data = self.level_data.get((tx, ty))
+        record = self._make_tile_record(tx, ty, data) if data else None
+        if record is not None:
+            if present:
+                self._sorted_tiles_cache[index] = record
             else:
-                self.screen.blit(tile, (screen_x, screen_y))
+                order.insert(index, order_key)
+                self._sorted_tiles_cache.insert(index, record)
+        elif present:
+            del order[index]
+            del self._sorted_tiles_cache[index]
+        
+        self._level_blits_key = None
+    
+    def _sync_zoom_caches(self):
+        """Переключает кэши масштабированных тайлов и пересчитывает таблицу смещений, если zoom изменился"""
+        if self.camera_zoom != self._cached_zoom:
+            # Масштабированные тайлы храним для каждой ступени zoom: при возврате
+            # к уже посещённому масштабу тайлы не масштабируются заново
+            scaled_tiles = self._scaled_tiles_by_zoom.get(self.camera_zoom)
+            if scaled_tiles is None:
+                scaled_tiles = self._scaled_tiles_by_zoom[self.camera_zoom] = [None] * self.tile_id_count
+            self._scaled_tiles_cache = scaled_tiles
+            self._iso_table = self._build_iso_table(self.camera_zoom)
+            self._diamond_template = self._build_diamond_template(self.camera_zoom)
+            self._inv_tile_size = self._build_inv_tile_size(self.camera_zoom)
+            self._cached_zoom = self.camera_zoom
+    
+    @staticmethod
+    def _build_iso_table(zoom):
+        """
+        Строит таблицу экранных смещений клеток сетки (без камеры) для заданного zoom
+        
+        Returns:
+            list: table[tile_x][tile_y] = (offset_x, offset_y)
+        """
+        half_width = TILE_WIDTH // 2
+        half_height = TILE_HEIGHT // 2
+        return [
+            [((tile_x - tile_y) * half_width * zoom, (tile_x + tile_y) * half_height * zoom)
+             for tile_y in range(GRID_HEIGHT)]
+            for tile_x in range(GRID_WIDTH)
+        ]
+    
+    @staticmethod
+    def _build_inv_tile_size(zoom):
+        """Возвращает (1 / ширина клетки, 1 / высота клетки) на экране для заданного zoom"""
+        return 1 / (TILE_WIDTH * zoom), 1 / (TILE_HEIGHT * zoom)
+    
+    @staticmethod
+    def _build_diamond_template(zoom):
+        """Возвращает смещения вершин ромба клетки (верх, право, низ, лево) для заданного zoom"""
+        tw = int(TILE_WIDTH * zoom)
+        th = int(TILE_HEIGHT * zoom)
+        return ((tw // 2, 0), (tw, th // 2), (tw // 2, th), (0, th // 2))
+    
+    def _get_scaled_tile(self, tile_id, tile, width, height):
+        """
+        Возвращает тайл, масштабированный под текущий zoom (из кэша)
+        
+        У каждой ступени zoom свой список, индекс в нём - номер тайла
+        (TileSheet.first_tile_id + индекс в тайлсете): вместо хэширования ключа -
+        обращение по индексу.
+        """
+        scaled = self._scaled_tiles_cache[tile_id]
+        if scaled is None:
+            scaled = pygame.transform.scale(tile, (width, height))
+            self._scaled_tiles_cache[tile_id] = scaled
+        return scaled
+    
+    def _blit_batch(self, blit_list):
+        """Рисует список (surface, pos) одним вызовом (fblits в pygame-ce, иначе blits)"""
+        if self._fblits is not None:
+            self._fblits(blit_list)
+        else:
+            self.screen.blits(blit_list, doreturn=0)
     
     def _draw_grid(self):
-        """Отрисовка сетки"""
-        tw = int(TILE_WIDTH * self.camera_zoom)
-        th = int(TILE_HEIGHT * self.camera_zoom)
-        
-        # Предвычисляем границы экрана для оптимизации
-        screen_left = -tw
-        screen_right = SCREEN_WIDTH + tw
-        screen_top = -th
-        screen_bottom = SCREEN_HEIGHT + th
-        
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                # Рисуем ромб
-                sx, sy = self.iso_to_screen(x, y)
-                
-                # Пропускаем за пределами экрана (оптимизированная проверка)
-                if sx < screen_left or sx > screen_right:
-                    continue
-                if sy < screen_top or sy > screen_bottom:
-                    continue
-                
-                points = [
-                    (sx + tw // 2, sy),
-                    (sx + tw, sy + th // 2),
-                    (sx + tw // 2, sy + th),
-                    (sx, sy + th // 2)
-                ]
-                pygame.draw.polygon(self.screen, COLOR_GRID, points, 1)
+        """Отрисовка сетки (готовая поверхность, перестраивается при смене zoom)"""
+        # Поверхность сдвигается на целую часть смещения камеры, а дробная часть
+        # входит в ключ кэша - так сетка совпадает попиксельно с прямой отрисовкой
+        origin_x = math.floor(self.camera_x)
+        origin_y = math.floor(self.camera_y)
+        cache_key = (self.camera_zoom, self.camera_x - origin_x, self.camera_y - origin_y)
+        if self._grid_cache_key != cache_key:
+            self._grid_cache, self._grid_cache_offset = self._build_grid_surface(*cache_key)
+            self._grid_cache_key = cache_key
+        
+        offset_x, offset_y = self._grid_cache_offset
+        self.screen.blit(self._grid_cache, (origin_x - offset_x, origin_y - offset_y))
+    
+    def _build_grid_surface(self, zoom, frac_x, frac_y):
+        """
+        Рисует всю сетку уровня на отдельной прозрачной поверхности
+        
+        Args:
+            zoom: Масштаб камеры
+            frac_x, frac_y: Дробная часть смещения камеры
+        
+        Returns:
+            tuple: (surface, (offset_x, offset_y)) - offset - положение начала
+                   координат сетки на поверхности
+        """
+        tw = int(TILE_WIDTH * zoom)
+        th = int(TILE_HEIGHT * zoom)
+        half_width = TILE_WIDTH // 2
+        half_height = TILE_HEIGHT // 2
+        
+        # Запас в 2 пикселя, чтобы все координаты на поверхности были положительными
+        offset_x = math.ceil((GRID_HEIGHT - 1) * half_width * zoom) + 2
+        offset_y = 2
+        width = offset_x + math.ceil((GRID_WIDTH - 1) * half_width * zoom) + tw + 4
+        height = offset_y + math.ceil((GRID_WIDTH + GRID_HEIGHT - 2) * half_height * zoom) + th + 4
+        
+        # Соседние ромбы делят рёбра, поэтому сетка - это два семейства
+        # диагональных линий через углы клеток, а не 4 ребра на каждую клетку
+        step_x = half_width * zoom
+        step_y = half_height * zoom
+        origin_x = tw // 2 + frac_x + offset_x
+        origin_y = frac_y + offset_y
+        
+        def corner(i, j):
+            return ((i - j) * step_x + origin_x, (i + j) * step_y + origin_y)
+        
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        for j in range(GRID_HEIGHT + 1):
+            pygame.draw.line(surface, COLOR_GRID, corner(0, j), corner(GRID_WIDTH, j))
+        for i in range(GRID_WIDTH + 1):
+            pygame.draw.line(surface, COLOR_GRID, corner(i, 0), corner(i, GRID_HEIGHT))
+        
+        return surface.convert_alpha(), (offset_x, offset_y)
     
     def _draw_hover(self):
         """Отрисовка подсветки под курсором"""
@@ -564,8 +1032,20 @@ class LevelEditor:
         th = int(TILE_HEIGHT * self.camera_zoom)
         
         color = (255, 100, 100) if self.eraser_mode else COLOR_GRID_HOVER
+        preview = None if self.eraser_mode else self._get_hover_preview(tw, th)
+        self._sync_zoom_caches()
+        diamond = self._diamond_template
+        iso_table = self._iso_table
+        camera_x = self.camera_x
+        camera_y = self.camera_y
+        
+        # Контур и превью каждой клетки собираем в общий список и выводим одним blits
+        # (порядок сохраняется: контур клетки, затем её превью)
+        blit_list = []
+        append = blit_list.append
         
         # Рисуем подсветку для всех тайлов в области размещения
+        # (клетки внутри сетки - смещения берём прямо из таблицы для текущего zoom)
         for dx in range(-half_size, half_size + (1 if self.placement_size % 2 == 1 else 0)):
             for dy in range(-half_size, half_size + (1 if self.placement_size % 2 == 1 else 0)):
                 tile_x = center_x + dx
@@ -575,89 +1055,134 @@ class LevelEditor:
                 if not (0 <= tile_x < GRID_WIDTH and 0 <= tile_y < GRID_HEIGHT):
                     continue
                 
-                sx, sy = self.iso_to_screen(tile_x, tile_y)
-                
-                points = [
-                    (sx + tw // 2, sy),
-                    (sx + tw, sy + th // 2),
-                    (sx + tw // 2, sy + th),
-                    (sx, sy + th // 2)
-                ]
+                offset_x, offset_y = iso_table[tile_x][tile_y]
+                sx = offset_x + camera_x
+                sy = offset_y + camera_y
                 
-                pygame.draw.polygon(self.screen, color, points, 2)
+                # Контур растеризуется один раз для каждой дробной части позиции
+                origin_x = math.floor(sx)
+                origin_y = math.floor(sy)
+                outline = self._get_hover_outline(color, sx - origin_x, sy - origin_y, diamond)
+                append((outline, (origin_x - HOVER_OUTLINE_MARGIN, origin_y - HOVER_OUTLINE_MARGIN)))
                 
                 # Показываем превью тайла
-                if not self.eraser_mode and self.tilesets:
-                    tileset = self.tilesets[self.current_tileset_index]
-                    tile = tileset.get_tile(self.current_tile_index)
-                    if tile:
-                        preview = tile.copy()
-                        preview.set_alpha(150)
-                        if self.camera_zoom != 1.0:
-                            preview = pygame.transform.scale(preview, (tw, th))
-                        self.screen.blit(preview, (sx, sy))
+                if preview is not None:
+                    append((preview, (sx, sy)))
+        
+        self._blit_batch(blit_list)
+    
+    def _get_hover_outline(self, color, frac_x, frac_y, diamond):
+        """Возвращает поверхность с контуром ромба клетки (из кэша)"""
+        key = (self.camera_zoom, color, frac_x, frac_y)
+        outline = self._outline_cache.get(key)
+        if outline is None:
+            margin = HOVER_OUTLINE_MARGIN
+            width = diamond[1][0] + 2 * margin + 1
+            height = diamond[2][1] + 2 * margin + 1
+            outline = pygame.Surface((width, height), pygame.SRCALPHA)
+            points = [(frac_x + margin + dx_point, frac_y + margin + dy_point) for dx_point, dy_point in diamond]
+            pygame.draw.polygon(outline, color, points, 2)
+            outline = outline.convert_alpha()
+            # Дробные части меняются вместе с камерой - не даём кэшу расти без предела
+            if len(self._outline_cache) >= 256:
+                self._outline_cache.clear()
+            self._outline_cache[key] = outline
+        return outline
+    
+    def _get_hover_preview(self, width, height):
+        """Возвращает полупрозрачное превью текущего тайла (из кэша, по ступеням zoom)"""
+        if not self.tilesets:
+            return None
+        
+        self._sync_zoom_caches()
+        tileset = self.tilesets[self.current_tileset_index]
+        key = (tileset.name, self.current_tile_index, self.camera_zoom)
+        if key in self._ghost_cache:
+            return self._ghost_cache[key]
+        
+        tile = tileset.get_tile(self.current_tile_index)
+        preview = None
+        if tile:
+            # Масштабированный тайл берём из общего кэша уровня
+            if self.camera_zoom != 1.0:
+                tile_id = tileset.first_tile_id + self.current_tile_index
+                tile = self._get_scaled_tile(tile_id, tile, width, height)
+            preview = tile.copy()
+            preview.set_alpha(150)
+        self._ghost_cache[key] = preview
+        return preview
+    
+    def _build_panel_background(self):
+        """
+        Рисует неизменные элементы панели на отдельной поверхности
+        
+        Фон, заголовок, стрелки тайлсетов, кнопки Save/New, подпись и фон
+        списка уровней, кнопка "+ New Level" - всё, что не зависит от состояния.
+        Координаты те же, что в _draw_panel, со сдвигом на левый край панели.
+        """
+        surface = pygame.Surface((self.panel_width, SCREEN_HEIGHT)).convert()
+        surface.fill(COLOR_PANEL_BG)
+        pygame.draw.line(surface, COLOR_GRID, (0, 0), (0, SCREEN_HEIGHT), 2)
+        
+        x = 10
+        surface.blit(self.font_large.render("Level Editor", True, COLOR_ACCENT), (x, 10))
+        
+        if self.tilesets:
+            surface.blit(self.font.render("◀", True, COLOR_TEXT), (x, 50))
+            surface.blit(self.font.render("▶", True, COLOR_TEXT), (x + self.panel_width - 30, 50))
+        
+        for text, bx, bw in (("Save", 10, 80), ("New", 100, 80)):
+            btn_rect = pygame.Rect(bx, 100, bw, 28)
+            pygame.draw.rect(surface, COLOR_BUTTON, btn_rect, border_radius=4)
+            btn_text = self.font_small.render(text, True, COLOR_TEXT)
+            surface.blit(btn_text, (btn_rect.x + (bw - btn_text.get_width()) // 2, btn_rect.y + 6))
+        
+        surface.blit(self.font_small.render("Levels:", True, COLOR_TEXT), (x, 140))
+        pygame.draw.rect(surface, COLOR_BG, pygame.Rect(x - 5, 160, self.panel_width - 20, 100), border_radius=4)
+        
+        new_level_btn = pygame.Rect(x - 5, 265, self.panel_width - 20, 24)
+        pygame.draw.rect(surface, COLOR_BUTTON, new_level_btn, border_radius=4)
+        new_text = self.font_small.render("+ New Level", True, COLOR_TEXT)
+        surface.blit(new_text, (x + (new_level_btn.width - new_text.get_width()) // 2, 268))
+        
+        self._panel_background = surface
+        return surface
     
     def _draw_panel(self):
         """Отрисовка боковой панели"""
-        panel_rect = pygame.Rect(SCREEN_WIDTH - self.panel_width, 0, self.panel_width, SCREEN_HEIGHT)
-        pygame.draw.rect(self.screen, COLOR_PANEL_BG, panel_rect)
-        pygame.draw.line(self.screen, COLOR_GRID, (panel_rect.x, 0), (panel_rect.x, SCREEN_HEIGHT), 2)
+        # Неизменные элементы - одной готовой поверхностью, поверх - только то, что зависит от состояния
+        background = self._panel_background or self._build_panel_background()
+        self.screen.blit(background, (SCREEN_WIDTH - self.panel_width, 0))
         
         x = SCREEN_WIDTH - self.panel_width + 10
-        y = 10
-        
-        # Заголовок
-        title = self.font_large.render("Level Editor", True, COLOR_ACCENT)
-        self.screen.blit(title, (x, y))
-        y += 40
+        y = 50
         
         # Текущий тайлсет
         if self.tilesets:
             tileset = self.tilesets[self.current_tileset_index]
             
-            # Стрелки навигации
-            arrow_left = self.font.render("◀", True, COLOR_TEXT)
-            arrow_right = self.font.render("▶", True, COLOR_TEXT)
-            self.screen.blit(arrow_left, (x, y))
-            
-            ts_name = self.font.render(tileset.name, True, COLOR_TEXT)
+            ts_name = render_text(self.font, tileset.name, COLOR_TEXT)
             name_x = x + (self.panel_width - 20 - ts_name.get_width()) // 2
             self.screen.blit(ts_name, (name_x, y))
-            
-            self.screen.blit(arrow_right, (x + self.panel_width - 30, y))
             y += 30
             
             # Текущий тайл
-            tile_info = self.font_small.render(f"Tile: {self.current_tile_index + 1}/{tileset.tile_count}", True, COLOR_TEXT_DIM)
+            tile_info = render_text(self.font_small, f"Tile: {self.current_tile_index + 1}/{tileset.tile_count}", COLOR_TEXT_DIM)
             self.screen.blit(tile_info, (x, y))
             y += 25
         
-        # Кнопки
+        # Кнопка ластика (Save и New - в фоне панели)
         y = 100
-        buttons = [
-            ("Save", 10, 80),
-            ("New", 100, 80),
-            ("Eraser" if not self.eraser_mode else "ERASER!", 190, 80)
-        ]
-        
-        for text, bx, bw in buttons:
-            btn_rect = pygame.Rect(SCREEN_WIDTH - self.panel_width + bx, y, bw, 28)
-            color = COLOR_ACCENT if text == "ERASER!" else COLOR_BUTTON
-            pygame.draw.rect(self.screen, color, btn_rect, border_radius=4)
-            btn_text = self.font_small.render(text, True, COLOR_TEXT)
-            self.screen.blit(btn_text, (btn_rect.x + (bw - btn_text.get_width()) // 2, btn_rect.y + 6))
-        
-        y = 140
-        
-        # Список уровней
-        level_label = self.font_small.render("Levels:", True, COLOR_TEXT)
-        self.screen.blit(level_label, (x, y))
-        y += 20
-        
-        # Область списка уровней
+        text, bx, bw = ("Eraser" if not self.eraser_mode else "ERASER!", 190, 80)
+        btn_rect = pygame.Rect(SCREEN_WIDTH - self.panel_width + bx, y, bw, 28)
+        color = COLOR_ACCENT if text == "ERASER!" else COLOR_BUTTON
+        pygame.draw.rect(self.screen, color, btn_rect, border_radius=4)
+        btn_text = render_text(self.font_small, text, COLOR_TEXT)
+        self.screen.blit(btn_text, (btn_rect.x + (bw - btn_text.get_width()) // 2, btn_rect.y + 6))
+        
+        # Список уровней (подпись и фон - в фоне панели)
+        y = 160
         level_list_height = 100
-        level_list_rect = pygame.Rect(x - 5, y, self.panel_width - 20, level_list_height)
-        pygame.draw.rect(self.screen, COLOR_BG, level_list_rect, border_radius=4)
         
         # Область отсечения для списка
         clip_rect = pygame.Rect(x - 5, y, self.panel_width - 20, level_list_height)
@@ -675,18 +1200,11 @@ class LevelEditor:
                 item_rect = pygame.Rect(x - 5, item_y, self.panel_width - 20, item_height)
                 pygame.draw.rect(self.screen, COLOR_ACCENT, item_rect, border_radius=2)
             
-            level_text = self.font_small.render(level_name, True, COLOR_TEXT)
+            level_text = render_text(self.font_small, level_name, COLOR_TEXT)
             self.screen.blit(level_text, (x, item_y + 2))
         
         self.screen.set_clip(None)
         
-        # Кнопка "New Level" в списке
-        y += level_list_height + 5
-        new_level_btn = pygame.Rect(x - 5, y, self.panel_width - 20, 24)
-        pygame.draw.rect(self.screen, COLOR_BUTTON, new_level_btn, border_radius=4)
-        new_text = self.font_small.render("+ New Level", True, COLOR_TEXT)
-        self.screen.blit(new_text, (x + (new_level_btn.width - new_text.get_width()) // 2, y + 3))
-        
         y = 270
         
         # Сетка тайлов
@@ -700,25 +1218,35 @@ class LevelEditor:
             clip_rect = pygame.Rect(SCREEN_WIDTH - self.panel_width, y, self.panel_width, SCREEN_HEIGHT - y)
             self.screen.set_clip(clip_rect)
             
-            for i, tile in enumerate(tileset.tiles):
-                col = i % cols
-                row = i // cols
-                
-                tx = x + col * (tile_preview_size + padding)
-                ty = y + row * (tile_preview_size + padding) - self.tile_selector_scroll
-                
-                if ty + tile_preview_size < y or ty > SCREEN_HEIGHT:
-                    continue
-                
-                # Фон тайла
-                tile_rect = pygame.Rect(tx, ty, tile_preview_size, tile_preview_size)
-                bg_color = COLOR_ACCENT if i == self.current_tile_index else COLOR_BUTTON
-                pygame.draw.rect(self.screen, bg_color, tile_rect, border_radius=4)
-                
-                # Тайл (масштабированный)
-                scaled = pygame.transform.scale(tile, (tile_preview_size - 4, (tile_preview_size - 4) // 2))
-                self.screen.blit(scaled, (tx + 2, ty + tile_preview_size // 4))
+            # Фоны ячеек рисуем сразу, а превью тайлов (внутри своих ячеек, не
+            # перекрываются) собираем и выводим одним вызовом blits.
+            # На время серии draw.rect экран заблокирован один раз, а не на каждый вызов
+            # (blit в заблокированную поверхность невозможен, поэтому blits - после unlock)
+            blit_list = []
+            previews = tileset.get_preview_tiles(tile_preview_size - 4, (tile_preview_size - 4) // 2)
+            self.screen.lock()
+            try:
+                for i, preview in enumerate(previews):
+                    col = i % cols
+                    row = i // cols
+                    
+                    tx = x + col * (tile_preview_size + padding)
+                    ty = y + row * (tile_preview_size + padding) - self.tile_selector_scroll
+                    
+                    if ty + tile_preview_size < y or ty > SCREEN_HEIGHT:
+                        continue
+                    
+                    # Фон тайла
+                    tile_rect = pygame.Rect(tx, ty, tile_preview_size, tile_preview_size)
+                    bg_color = COLOR_ACCENT if i == self.current_tile_index else COLOR_BUTTON
+                    pygame.draw.rect(self.screen, bg_color, tile_rect, border_radius=4)
+                    
+                    # Тайл (масштабированный заранее)
+                    blit_list.append((preview, (tx + 2, ty + tile_preview_size // 4)))
+            finally:
+                self.screen.unlock()
             
+            self._blit_batch(blit_list)
             self.screen.set_clip(None)
     
     def _draw_help(self):
@@ -729,11 +1257,17 @@ class LevelEditor:
             f"Level: {self.level_name} | Tiles: {len(self.level_data)} | Zoom: {self.camera_zoom:.1f}x | Placement: {self.placement_size}x{self.placement_size}"
         ]
         
+        # Строки рендерятся заново только при изменении текста, выводятся одним blits
+        blit_list = []
         y = SCREEN_HEIGHT - 60
-        for text in help_texts:
-            surface = self.font_small.render(text, True, COLOR_TEXT_DIM)
-            self.screen.blit(surface, (10, y))
+        for line, text in enumerate(help_texts):
+            cached = self._help_text_cache[line]
+            if cached is None or cached[0] != text:
+                cached = self._help_text_cache[line] = (text, self.font_small.render(text, True, COLOR_TEXT_DIM))
+            blit_list.append((cached[1], (10, y)))
             y += 18
+        
+        self._blit_batch(blit_list)
     
     def _save_level(self):
         """Сохранение уровня"""
@@ -742,19 +1276,49 @@ class LevelEditor:
         
         level_file = levels_path / f"{self.level_name}.json"
         
-        # Конвертируем ключи в строки для JSON
+        # Снимок данных делаем здесь, чтобы дальнейшие правки уровня
+        # не попали в сохраняемый файл
         save_data = {
             'name': self.level_name,
             'width': GRID_WIDTH,
             'height': GRID_HEIGHT,
-            'tiles': {f"{k[0]},{k[1]}": v for k, v in self.level_data.items()}
+            'tiles_v2': pack_level_tiles(self.level_data)
         }
         
-        with open(level_file, 'w', encoding='utf-8') as f:
-            json.dump(save_data, f, indent=2, ensure_ascii=False)
+        # Сериализация и запись - в фоновом потоке
+        future = self._io_executor.submit(self._write_level_file, level_file, save_data)
+        future.add_done_callback(self._on_level_saved)
+    
+    @staticmethod
+    def _write_level_file(level_file, save_data):
+        """Записывает данные уровня в JSON-файл (выполняется в потоке записи)"""
+        # Без отступов: в tiles_v2 длинные списки чисел, с indent каждое число заняло бы строку
+        if orjson is not None:
+            payload = orjson.dumps(save_data)
+        else:
+            payload = json.dumps(save_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
         
-        print(f"Level saved: {level_file}")
-        self._refresh_level_list()
+        # Файл пишется целиком одним вызовом во временный и подменяет старый через os.replace:
+        # при сбое во время записи прежняя версия уровня остаётся целой
+        level_file = Path(level_file)
+        tmp_file = level_file.with_suffix('.json.tmp')
+        try:
+            tmp_file.write_bytes(payload)
+            os.replace(tmp_file, level_file)
+        except OSError:
+            tmp_file.unlink(missing_ok=True)
+            raise
+        return level_file
+    
+    def _on_level_saved(self, future):
+        """Сообщает о результате фонового сохранения"""
+        error = future.exception()
+        if error is not None:
+            print(f"Error saving level: {error}")
+            return
+        
+        print(f"Level saved: {future.result()}")
+        self._level_list_stale = True
     
     def _load_level_by_name(self, level_name):
         """Загружает уровень по имени"""
@@ -767,26 +1331,70 @@ class LevelEditor:
             print(f"Level not found: {level_name}")
     
     def _load_level(self, filepath):
-        """Загрузка уровня из файла"""
-        try:
+        """
+        Загрузка уровня из файла
+        
+        Чтение и разбор JSON идут в потоке записи (после уже начатых сохранений),
+        новый уровень подставляется в _update. До этого на экране остаётся прежний
+        уровень, а рисование и стирание отключены.
+        """
+        self._pending_level_load = self._io_executor.submit(self._read_level_file, filepath)
+    
+    @staticmethod
+    def _read_level_file(filepath):
+        """Читает и разбирает файл уровня (выполняется в потоке записи)"""
+        if orjson is not None:
+            # Разбор прямо из отображения файла в память, без промежуточного bytes
+            with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    data = orjson.loads(view)
+        else:
             with open(filepath, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            
-            self.level_name = data.get('name', Path(filepath).stem)
-            self.level_data = {}
-            
-            for key, value in data.get('tiles', {}).items():
-                x, y = map(int, key.split(','))
-                self.level_data[(x, y)] = value
-            
-            # Помечаем данные как измененные для пересчета кэша
-            self._level_data_dirty = True
-            self._scaled_tiles_cache.clear()  # Очищаем кэш при загрузке
-            
-            print(f"Level loaded: {filepath}")
-            self._refresh_level_list()
+        return filepath, data, unpack_level_tiles(data)
+    
+    def _apply_loaded_level(self, future):
+        """Подставляет уровень, прочитанный _read_level_file"""
+        try:
+            filepath, data, level_data = future.result()
         except Exception as e:
             print(f"Error loading level: {e}")
+            return
+        
+        self.level_name = data.get('name', Path(filepath).stem)
+        self.level_data = level_data
+        
+        missing_tilesets = set()
+        for value in self.level_data.values():
+            # Проверяем ссылку на тайлсет по словарю (без перебора списка)
+            if value.get('tileset') not in self.tilesets_dict:
+                missing_tilesets.add(value.get('tileset'))
+        
+        if missing_tilesets:
+            print(f"Warning: unknown tilesets in level: {', '.join(map(str, sorted(missing_tilesets, key=str)))}")
+        
+        # Помечаем данные как измененные для пересчета кэша
+        self._level_data_dirty = True
+        # Кэш масштабированных тайлов не сбрасываем: он зависит только от тайлсетов и zoom,
+        # а не от уровня - тайлы, общие для уровней, не масштабируются заново
+        
+        if 'tiles_v2' not in data and data.get('tiles'):
+            self._migrate_level_file(filepath, data)
+        
+        print(f"Level loaded: {filepath}")
+        self._refresh_level_list()
+    
+    def _migrate_level_file(self, filepath, data):
+        """
+        Переписывает файл старого формата tiles {"x,y": value} в tiles_v2 (один раз, в потоке записи)
+        
+        Остальные поля файла (source, player_spawn и т.п.) сохраняются как есть,
+        следующие загрузки идут без разбора строк-ключей "x,y".
+        """
+        migrated = {key: value for key, value in data.items() if key != 'tiles'}
+        migrated['tiles_v2'] = pack_level_tiles(self.level_data)
+        future = self._io_executor.submit(self._write_level_file, Path(filepath), migrated)
+        future.add_done_callback(self._on_level_saved)
     
     def _create_new_level(self):
         """Создает новый пустой уровень"""
@@ -795,21 +1403,21 @@ class LevelEditor:
         counter = 1
         new_name = base_name
         
-        levels_path = Path(__file__).parent.parent.parent / "game" / "levels"
-        levels_path.mkdir(exist_ok=True)
-        
-        while (levels_path / f"{new_name}.json").exists():
+        # Занятые имена - из списка уровней, без проверки файла на каждое имя.
+        # Папку здесь не создаём: файл появится только при сохранении (см. _save_level)
+        self._refresh_level_list()
+        existing = set(self.available_levels)
+        while new_name in existing:
             new_name = f"{base_name}_{counter}"
             counter += 1
         
+        self._pending_level_load = None  # Незавершённая загрузка другого уровня больше не нужна
         self.level_name = new_name
         self.level_data = {}
         self._level_data_dirty = True  # Помечаем данные как измененные
-        self._scaled_tiles_cache.clear()  # Очищаем кэш
-        self._refresh_level_list()
-        # Прокручиваем список к новому уровню
-        if new_name in self.available_levels:
-            level_index = self.available_levels.index(new_name)
+        # Прокручиваем список к новому уровню (список отсортирован - ищем бинарным поиском)
+        level_index = bisect.bisect_left(self.available_levels, new_name)
+        if level_index < len(self.available_levels) and self.available_levels[level_index] == new_name:
             self.level_list_scroll = max(0, level_index * 22 - 50)
         print(f"New level created: {new_name}")
 